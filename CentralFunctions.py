@@ -4,10 +4,30 @@ import requests
 import xml.etree.ElementTree as ET
 
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ui_bridge import IOBridge  # added
 from gemini_helper import suggest_item_specifics_with_gemini
 
 load_dotenv()
+
+
+def _build_ebay_session() -> requests.Session:
+    """Shared keep-alive session for the eBay Taxonomy, Trading and Account APIs."""
+    session = requests.Session()
+    # Only idempotent reads are retried; a retried AddItem/Revise call could double-apply
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+EBAY_SESSION = _build_ebay_session()
 # ---- eBay aspect key mapping (edit here) ------------------------------------
 # Left side: various inputs you might see (Amazon, bulk, user paste)
 # Right side: the final eBay aspect name to send.
@@ -88,10 +108,19 @@ def merge_specifics_in_order(*dicts: dict) -> dict:
             merged[str(k)] = str(v)
     return merged
 
+# The default tree for a marketplace changes only across eBay taxonomy releases, so one
+# successful lookup per process is enough
+_CATEGORY_TREE_IDS = {}
+
+
 def categoryTreeID(access_token):
     """
     Fetches the default category tree ID from the eBay API for the GB marketplace.
     """
+    cached = _CATEGORY_TREE_IDS.get('EBAY_GB')
+    if cached is not None:
+        return cached
+
     headers = {
         'Authorization': 'Bearer ' + access_token,
     }
@@ -101,7 +130,7 @@ def categoryTreeID(access_token):
     }
 
     try:
-        response = requests.get(
+        response = EBAY_SESSION.get(
             'https://api.ebay.com/commerce/taxonomy/v1/get_default_category_tree_id',
             params=params,
             headers=headers
@@ -111,6 +140,7 @@ def categoryTreeID(access_token):
 
         categoryJson = response.json()
         categoryTreeId = categoryJson["categoryTreeId"]
+        _CATEGORY_TREE_IDS['EBAY_GB'] = categoryTreeId
 
     except requests.exceptions.HTTPError as http_err:
         # Avoid printing; default to GB tree id 3
@@ -134,7 +164,7 @@ def categoryID(access_token, categoryTreeId, title_variable):
     url = f'https://api.ebay.com/commerce/taxonomy/v1/category_tree/{categoryTreeId}/get_category_suggestions'
 
     try:
-        response = requests.get(url, params=params, headers=headers)
+        response = EBAY_SESSION.get(url, params=params, headers=headers)
 
         # Raise an exception for bad status codes (4xx or 5xx)
         response.raise_for_status()
@@ -177,7 +207,7 @@ def get_item_specifics(token, category_tree_id, category_id, product_data, io: I
         io.log("--- Populating Item Specifics ---")
 
         # ---------- 1) Fetch taxonomy first ----------
-        tx_resp = requests.get(
+        tx_resp = EBAY_SESSION.get(
             f"https://api.ebay.com/commerce/taxonomy/v1/category_tree/{category_tree_id}/get_item_aspects_for_category",
             params={"category_id": category_id},
             headers=headers
@@ -350,7 +380,7 @@ def set_seller_note(item_id, note, user_token, app_id, dev_id, cert_id, io: IOBr
     """
 
     try:
-        response = requests.post(endpoint, data=xml_body.encode('utf-8'), headers=headers)
+        response = EBAY_SESSION.post(endpoint, data=xml_body.encode('utf-8'), headers=headers)
         tree = ET.fromstring(response.content)
         namespace = '{urn:ebay:apis:eBLBaseComponents}'
         ack_el = tree.find(f'{namespace}Ack')
@@ -399,7 +429,7 @@ def get_seller_note(item_id, user_token, app_id, dev_id, cert_id, io: IOBridge |
     """
 
     try:
-        response = requests.post(endpoint, data=xml_body.encode("utf-8"), headers=headers)
+        response = EBAY_SESSION.post(endpoint, data=xml_body.encode("utf-8"), headers=headers)
         tree = ET.fromstring(response.content)
         namespace = '{urn:ebay:apis:eBLBaseComponents}'
         ack_el = tree.find(f'{namespace}Ack')
@@ -464,7 +494,7 @@ def revise_inventory_quantity(item_id: str, new_quantity: int, user_token, app_i
 
     try:
         io.log(f"Revising inventory quantity for Item ID {item_id} to {new_quantity}…")
-        response = requests.post(endpoint, data=xml_body.encode("utf-8"), headers=headers)
+        response = EBAY_SESSION.post(endpoint, data=xml_body.encode("utf-8"), headers=headers)
         tree = ET.fromstring(response.content)
         namespace = '{urn:ebay:apis:eBLBaseComponents}'
         ack_el = tree.find(f'{namespace}Ack')
@@ -524,7 +554,7 @@ def get_item_available_quantity(item_id: str, user_token, app_id, dev_id, cert_i
 
     try:
         io.log(f"Fetching current quantity for Item ID {item_id}…")
-        response = requests.post(endpoint, data=xml_body.encode("utf-8"), headers=headers)
+        response = EBAY_SESSION.post(endpoint, data=xml_body.encode("utf-8"), headers=headers)
         tree = ET.fromstring(response.content)
         namespace = '{urn:ebay:apis:eBLBaseComponents}'
         ack_el = tree.find(f'{namespace}Ack')
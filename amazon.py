@@ -3,21 +3,71 @@ from __future__ import annotations
 import requests
 import json
 import re
+import threading
 from typing import Dict, Any, Optional
 from bs4 import BeautifulSoup
 from ui_bridge import IOBridge
 
+# lxml's C parser is much faster on full product pages; html.parser still handles fragments
+try:
+    import lxml  # noqa: F401
+    _PAGE_PARSER = "lxml"
+except Exception:
+    _PAGE_PARSER = "html.parser"
+
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:66.0) Gecko/20100101 Firefox/66.0",
     "Accept-Encoding": "gzip, deflate",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "DNT": "1",
-    "Connection": "close",
     "Upgrade-Insecure-Requests": "1"
 }
 
+# One keep-alive session per thread (requests.Session is not documented as thread-safe,
+# and bulk runs scrape from several threads), so each thread reuses its TLS connection
+_SESSION_LOCAL = threading.local()
+
+
+def _session() -> requests.Session:
+    session = getattr(_SESSION_LOCAL, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(headers)
+        _SESSION_LOCAL.session = session
+    # Start every scrape cookie-free, as separate requests.get calls did, so one page's
+    # cookies don't steer which variant (or bot check) Amazon serves for the next
+    session.cookies.clear()
+    return session
+
 IGNORED_KEYS = {k.lower() for k in {'ASIN','Customer Reviews','Best Sellers Rank','Date First Available'}}
 
+# Description elements removed outright (substring match on class/id, then exact class match)
+_DESC_DROP_TERMS = ('comparison', 'video', 'player', 'popover', 'vjs-', 'apm-sidewide')
+_CAROUSEL_CONTROL_CLASSES = frozenset({
+    'a-carousel-left', 'a-carousel-right',
+    'aplus-pagination-wrapper', 'aplus-carousel-nav',
+    'a-carousel-goto-prevpage', 'a-carousel-goto-nextpage',
+    'aplus-pagination-dots',
+})
+
+# Patterns used on every scrape, compiled once
+_KEY_PUNCT_RE = re.compile(r'[^\w\s:]')
+_KEY_CLEAN_RE = re.compile(r'[^\w\s-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_PRICE_RE = re.compile(r'[^\d.]')
+_VOUCHER_NOISE_RE = re.compile(r'apply|voucher|terms|shop|items|\|', re.IGNORECASE)
+_IMAGE_BLOCK_RE = re.compile(r'ImageBlockATF')
+_JS_DATA_RE = re.compile(r"var\s+data\s*=\s*({.*?});", re.DOTALL)
+_JS_COMMENT_RE = re.compile(r"(?<!https:)(?<!http:)//.*")
+_JS_QUOTED_KEY_RE = re.compile(r"'(.*?)'\s*:")
+_JS_DATE_NOW_RE = re.compile(r"Date\.now\(\)")
+_JS_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+# Lazy-loaded description images carry one of these placeholders in src and the real URL
+# in one of the data-* attributes
+_PLACEHOLDER_IMAGES = ('grey-pixel.gif', 'spacer.gif')
+_LAZY_SRC_ATTRS = ('data-src', 'data-lazy-src', 'data-src-la', 'data-a-lazy-src')
+
 # Preferred ID order to try for product info tables
 _ID_ORDER = ['prodDetails', 'tech']
 
@@ -65,7 +115,7 @@ def handle_list(page, id):
     for info in prod_info_list:
         try:
             raw_key_text = info.span.contents[1].text
-            cleaned_text = re.sub(r'[^\w\s:]', '', raw_key_text)
+            cleaned_text = _KEY_PUNCT_RE.sub('', raw_key_text)
             key = cleaned_text.replace(':', '').strip()
             if key and key.lower() not in IGNORED_KEYS:
                 raw_value_text = info.span.contents[3].text
@@ -103,9 +153,9 @@ def get_product_facts(page, id='productFactsDesktopExpander') -> Dict[str, str]:
                 if not key or not value:
                     continue
                 # Clean up: remove non-word punctuation except spaces and basic separators
-                key_clean = re.sub(r'[^\w\s-]', '', key).strip()
+                key_clean = _KEY_CLEAN_RE.sub('', key).strip()
                 # Normalise whitespace in value
-                value_clean = re.sub(r'\s+', ' ', value)
+                value_clean = _WHITESPACE_RE.sub(' ', value)
                 if key_clean and key_clean.lower() not in IGNORED_KEYS:
                     facts[key_clean] = value_clean.encode("ascii", "ignore").decode()
             except Exception:
@@ -142,7 +192,7 @@ def get_product_facts_list(page, id='productFactsDesktopExpander') -> list[str]:
             text = span.get_text(separator=' ', strip=True) if span else li.get_text(separator=' ', strip=True)
             text = (text or '').strip()
             if text:
-                text = re.sub(r"\s+", " ", text)
+                text = _WHITESPACE_RE.sub(' ', text)
                 items.append(text)
         # Deduplicate while preserving order
         seen = set()
@@ -155,20 +205,36 @@ def get_product_facts_list(page, id='productFactsDesktopExpander') -> list[str]:
     except Exception:
         return items
 
-def get_image_urls(page):
+def _find_image_block_script(html: str) -> Optional[str]:
+    """Return the body of the first <script> containing 'ImageBlockATF', sliced from the raw page."""
+    pos = html.find('ImageBlockATF')
+    while pos != -1:
+        start = html.rfind('<script', 0, pos)
+        # The marker must sit inside an open <script>, not after one that already closed
+        if start != -1 and html.find('</script>', start, pos) == -1:
+            body_start = html.find('>', start, pos)
+            end = html.find('</script>', pos)
+            if body_start != -1 and end != -1:
+                return html[body_start + 1:end]
+        pos = html.find('ImageBlockATF', pos + 1)
+    return None
+
+
+def get_image_urls(page, html: Optional[str] = None):
     # 1. Find the specific script tag containing the image data
-    # We look for a script tag that contains the string 'ImageBlockATF'
-    script_tag = page.find('script', string=re.compile(r'ImageBlockATF'))
-
-    if not script_tag:
-        return []
+    # We look for a script tag that contains the string 'ImageBlockATF'; with the raw page
+    # text to hand this is a plain substring search instead of a walk over every <script>
+    if html is not None:
+        script_content = _find_image_block_script(html)
+    else:
+        script_tag = page.find('script', string=_IMAGE_BLOCK_RE)
+        script_content = script_tag.string if script_tag else None
 
-    script_content = script_tag.string
     if not script_content:
         return []
 
     # 2. Extract the object inside 'var data = { ... };'
-    match = re.search(r"var\s+data\s*=\s*({.*?});", script_content, re.DOTALL)
+    match = _JS_DATA_RE.search(script_content)
     if not match:
         return []
 
@@ -176,21 +242,19 @@ def get_image_urls(page):
 
     # 3. Clean the string to make it valid JSON
     # Remove JavaScript comments (////// ...)
-    js_obj = re.sub(r"(?<!https:)(?<!http:)//.*", "", js_obj)
+    js_obj = _JS_COMMENT_RE.sub("", js_obj)
 
     # Replace single quotes with double quotes for keys and values
     # Regex handles keys: 'key': -> "key":
-    js_obj = re.sub(r"'(.*?)'\s*:", r'"\1":', js_obj)
+    js_obj = _JS_QUOTED_KEY_RE.sub(r'"\1":', js_obj)
     # Remaining single quotes for values: 'value' -> "value"
     js_obj = js_obj.replace("'", '"')
 
     # 4. Handle JS-specific values
-    js_obj = re.sub(r"Date\.now\(\)", "null", js_obj)
-    js_obj = js_obj.replace("false", "false").replace("true", "true").replace("null", "null")
+    js_obj = _JS_DATE_NOW_RE.sub("null", js_obj)
 
     # 5. Clean up trailing commas (common in JS, illegal in JSON)
-    js_obj = re.sub(r",\s*}", "}", js_obj)
-    js_obj = re.sub(r",\s*]", "]", js_obj)
+    js_obj = _JS_TRAILING_COMMA_RE.sub(r"\1", js_obj)
 
     try:
         data_obj = json.loads(js_obj)
@@ -202,7 +266,8 @@ def get_image_urls(page):
             hi_res = img.get('hiRes')
             if isinstance(hi_res, str) and hi_res.strip():
                 urls.append(hi_res.strip())
-        return urls
+        # Variants often repeat the same image; keep the first occurrence of each URL
+        return list(dict.fromkeys(urls))
     except json.JSONDecodeError as e:
         print(f"JSON decoding error: {e}")
         return []
@@ -254,7 +319,7 @@ def get_whats_in_the_box(page) -> list[str]:
             text = (text or '').strip()
             if text:
                 # Normalise whitespace
-                text = re.sub(r"\s+", " ", text)
+                text = _WHITESPACE_RE.sub(' ', text)
                 items.append(text)
         # Deduplicate while preserving order
         seen = set()
@@ -321,9 +386,10 @@ def get_product_description(page) -> str:
         for comment in list(el_copy.find_all(string=lambda t: isinstance(t, Comment))):
             comment.extract()
 
-        # Extract (delete entirely) style, script, and noscript tags
-        for tag in list(el_copy.find_all(['style', 'script', 'noscript'])):
-            tag.extract()
+        # Delete style, script, and noscript tags; el_copy is private, so decompose() can free
+        # them outright instead of keeping the detached subtrees alive
+        for tag in el_copy.find_all(['style', 'script', 'noscript']):
+            tag.decompose()
 
         # Format aplus-carousel-actions properly (convert navigation tabs to styled horizontal bar)
         for actions_div in list(el_copy.find_all(class_=lambda x: x and 'aplus-carousel-actions' in x)):
@@ -349,24 +415,18 @@ def get_product_description(page) -> str:
             else:
                 actions_div.extract()
 
-        # Extract (delete entirely) comparison charts, video widgets, and popovers
+        # Delete comparison charts, video widgets, and popovers, plus carousel control buttons
+        # and pagination elements (to avoid leaking next/prev labels while keeping the slide
+        # images). One walk covers both; descendants of a deleted tag are skipped.
         for tag in list(el_copy.find_all(True)):
+            if tag.decomposed:
+                continue
             classes = tag.get('class') or []
             classes_str = " ".join(classes).lower()
             id_val = (tag.get('id') or '').lower()
-            if any(term in classes_str or term in id_val for term in ['comparison', 'video', 'player', 'popover', 'vjs-', 'apm-sidewide']):
-                tag.extract()
-
-        # Extract carousel control buttons and pagination elements to avoid leaking next/prev labels, while keeping the slide images
-        for tag in list(el_copy.find_all(True)):
-            classes = tag.get('class') or []
-            if any(c in classes for c in [
-                'a-carousel-left', 'a-carousel-right', 
-                'aplus-pagination-wrapper', 'aplus-carousel-nav',
-                'a-carousel-goto-prevpage', 'a-carousel-goto-nextpage',
-                'aplus-pagination-dots'
-            ]):
-                tag.extract()
+            if any(term in classes_str or term in id_val for term in _DESC_DROP_TERMS) or any(
+                    c in _CAROUSEL_CONTROL_CLASSES for c in classes):
+                tag.decompose()
 
         # Unwrap any list tags that belong to carousels to avoid ordered/unordered numbers/bullets next to slides
         for tag in list(el_copy.find_all(['ol', 'ul', 'li'])):
@@ -385,8 +445,8 @@ def get_product_description(page) -> str:
                 if tag.name == 'img':
                     # Keep only src and alt (handle lazy-loaded images)
                     src_val = tag.get('src') or ''
-                    if not src_val or 'grey-pixel.gif' in src_val or 'spacer.gif' in src_val:
-                        real_src = tag.get('data-src') or tag.get('data-lazy-src') or tag.get('data-src-la') or tag.get('data-a-lazy-src')
+                    if not src_val or any(p in src_val for p in _PLACEHOLDER_IMAGES):
+                        real_src = next((tag[a] for a in _LAZY_SRC_ATTRS if tag.get(a)), None)
                         if real_src:
                             src_val = real_src
                     tag.attrs = {'src': src_val, 'alt': tag.get('alt') or ''}
@@ -398,9 +458,8 @@ def get_product_description(page) -> str:
 
         cleaned_html = "".join([str(c) for c in el_copy.contents]).strip()
 
-        # Check if the extracted text content is empty (excluding comments/whitespace)
-        temp_soup = BeautifulSoup(cleaned_html, 'html.parser')
-        if not temp_soup.get_text(strip=True):
+        # Check if the extracted text content is empty (comments were already removed above)
+        if not el_copy.get_text(strip=True):
             return ""
 
         return cleaned_html
@@ -410,24 +469,29 @@ def get_product_description(page) -> str:
 
 # Public API
 
-def scrape_amazon(url: str, note: str = "", quantity: Optional[int] = None, custom_specifics: Optional[Dict[str, str]] = None, io: Optional[IOBridge] = None) -> Dict[str, Any]:
-    """Scrape an Amazon product page and return a product dict."""
+def scrape_amazon(url: str, note: str = "", quantity: Optional[int] = None, custom_specifics: Optional[Dict[str, str]] = None, io: Optional[IOBridge] = None, debug_html_path: Optional[str] = "website.html") -> Dict[str, Any]:
+    """Scrape an Amazon product page and return a product dict.
+
+    The raw page is dumped to `debug_html_path` for debugging; pass None to skip it
+    (e.g. when several scrapes run at once and would overwrite each other's dump).
+    """
     io = io or IOBridge()
     custom_specifics = custom_specifics or {}
 
     io.log("Sending Page Request")
-    page_request = requests.get(url, headers=headers)
+    page_request = _session().get(url)
     io.log("Parsing page data")
     page_content = page_request.text
-    page = BeautifulSoup(page_content, "html.parser")
+    page = BeautifulSoup(page_content, _PAGE_PARSER)
     io.log("Page data parsed")
 
     # Optionally write page for debugging
-    try:
-        with open("website.html", "w", encoding="utf-8") as f:
-            f.write(page_content)
-    except Exception:
-        pass
+    if debug_html_path:
+        try:
+            with open(debug_html_path, "w", encoding="utf-8") as f:
+                f.write(page_content)
+        except Exception:
+            pass
 
     prod_info_dict: Dict[str, Any] = {}
     prod_info_dict['URL'] = url
@@ -491,7 +555,7 @@ def scrape_amazon(url: str, note: str = "", quantity: Optional[int] = None, cust
                 if whole_span and fraction_span:
                     price_str = f"{whole_span.text.strip()}{fraction_span.text.strip()}"
         if price_str:
-            cleaned_price_str = re.sub(r'[^\d.]', '', price_str)
+            cleaned_price_str = _NON_PRICE_RE.sub('', price_str)
             try:
                 prod_info_dict['Price'] = float(cleaned_price_str)
             except (ValueError, TypeError):
@@ -511,7 +575,7 @@ def scrape_amazon(url: str, note: str = "", quantity: Optional[int] = None, cust
         coupon_element = page.find(class_="couponLabelText")
         if coupon_element:
             voucher_text = coupon_element.get_text(strip=True)
-            cleaned_text = re.sub(r'apply|voucher|terms|shop|items|\|', '', voucher_text, flags=re.IGNORECASE).strip()
+            cleaned_text = _VOUCHER_NOISE_RE.sub('', voucher_text).strip()
             if '%' in cleaned_text:
                 value_str = cleaned_text.replace('%', '').strip()
                 if value_str:
@@ -529,7 +593,7 @@ def scrape_amazon(url: str, note: str = "", quantity: Optional[int] = None, cust
     details = handle_list(page, 'detailBullets_feature_div')
     if details:
         prod_info_dict['detailBullets'] = details
-    prod_info_dict['imageUrls'] = get_image_urls(page)
+    prod_info_dict['imageUrls'] = get_image_urls(page, page_content)
 
     # Carry-through values from bulk parser (if provided)
     if isinstance(custom_specifics, dict) and custom_specifics:
@@ -1,5 +1,5 @@
 import re
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 
 COMMON_SPEC_KEYS = {
     "size", "size name", "style", "style name", "colour", "colour name", "color",
@@ -32,25 +32,50 @@ def _parse_specifics_line(line: str) -> Dict[str, str]:
     return {}
 
 
-def parse_bulk_items(text: str) -> List[Dict]:
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    blocks = []
+def _iter_blocks(lines: Iterable[str]) -> Iterator[List[str]]:
     current = []
-
-    for ln in lines:
+    has_url = False
+    # Lines after a blank line that follows the block's URL. They start a new item only if
+    # another URL turns up before the next separator (the README's hand-typed format);
+    # otherwise they still belong to the current item.
+    pending = None
+    for raw in lines:
+        ln = raw.strip()
+        if not ln:
+            if has_url and pending is None:
+                pending = []
+            continue
         if re.match(r'^\d+$', ln) or re.match(r'^J{5,}$', ln, re.IGNORECASE):
+            if pending:
+                current.extend(pending)
+            pending = None
             if current:
-                blocks.append(current)
+                yield current
                 current = []
-        else:
-            current.append(ln)
+            has_url = False
+            continue
+        is_url = bool(_url_re.search(ln))
+        if pending is not None:
+            if is_url:
+                yield current
+                current = pending + [ln]
+                pending = None
+            else:
+                pending.append(ln)
+            continue
+        current.append(ln)
+        has_url = has_url or is_url
+    if pending:
+        current.extend(pending)
     if current:
-        blocks.append(current)
+        yield current
+
 
-    items = []
+def iter_bulk_items(lines: Iterable[str]) -> Iterator[Dict]:
+    """Yield parsed items one block at a time so callers can start before the paste is fully parsed."""
     current_global_note = ""
 
-    for block in blocks:
+    for block in _iter_blocks(lines):
         url = ''
         qty = None
         local_notes = []
@@ -114,12 +139,14 @@ def parse_bulk_items(text: str) -> List[Dict]:
             title_candidates.sort(key=len, reverse=True)
             parsed_title = title_candidates[0]
 
-        items.append({
+        yield {
             "url": url,
             "quantity": qty if qty is not None else 1,
             "note": ' \n '.join(final_note_parts).strip(),
             "custom_specifics": custom_specifics,
             "title": parsed_title,
-        })
+        }
 
-    return items
\ No newline at end of file
+
+def parse_bulk_items(text: str) -> List[Dict]:
+    return list(iter_bulk_items(text.splitlines()))
@@ -4,10 +4,9 @@ import json
 import os
 import re
 import xml.etree.ElementTree as ET
-import requests
-from typing import Dict, Any
-from dotenv import load_dotenv
+from typing import Dict, Any, Optional, Tuple
 from ui_bridge import IOBridge
+from tokens import load_tokens
 from CentralFunctions import (
     categoryTreeID,
     categoryID,
@@ -17,12 +16,12 @@ from CentralFunctions import (
     increase_listing_quantity,
     find_minimum_price,
     map_one_dict,
+    EBAY_SESSION,
 )
 from datetime import datetime, timezone
 from pathlib import Path
 
-load_dotenv()
-
+# .env is loaded by CentralFunctions at import, before this module reads it
 OPEN_LISTING_PAGE = os.getenv("OPEN_LISTING_PAGE", "edit").strip().lower()
 
 
@@ -111,6 +110,17 @@ def _parse_duplicate_listing_item_id(errors: list[dict]) -> str | None:
     return None
 
 
+_DUPLICATE_SKIP = "Skip (do not list)"
+_DUPLICATE_CANCEL = "Cancel"
+# Duplicate-listing choice -> (increase quantity, append note)
+_DUPLICATE_ACTIONS = {
+    "Increase existing listing quantity only": (True, False),
+    "Append note to existing listing only": (False, True),
+    "Increase quantity + append note": (True, True),
+}
+_DUPLICATE_CHOICES = [_DUPLICATE_SKIP, *_DUPLICATE_ACTIONS, _DUPLICATE_CANCEL]
+
+
 def _handle_duplicate_listing(
     *,
     io: IOBridge,
@@ -141,23 +151,16 @@ def _handle_duplicate_listing(
     # Ask once per duplicate
     choice = io.prompt_choice(
         f"Duplicate listing detected. Existing eBay ItemID: {existing_item_id}.\nChoose what to do:",
-        [
-            "Skip (do not list)",
-            "Increase existing listing quantity only",
-            "Append note to existing listing only",
-            "Increase quantity + append note",
-            "Cancel",
-        ],
+        list(_DUPLICATE_CHOICES),
     )
 
-    if choice in (None, "Cancel"):
+    if choice in (None, _DUPLICATE_CANCEL):
         return {"ok": False, "error": "duplicate_cancelled", "existing_item_id": existing_item_id}
-    if choice == "Skip (do not list)":
+    if choice == _DUPLICATE_SKIP:
         io.log(f"Skipping duplicate listing; leaving existing item {existing_item_id} unchanged.")
         return {"ok": True, "result": "duplicate_skipped", "existing_item_id": existing_item_id}
 
-    do_qty = choice in ("Increase existing listing quantity only", "Increase quantity + append note")
-    do_note = choice in ("Append note to existing listing only", "Increase quantity + append note")
+    do_qty, do_note = _DUPLICATE_ACTIONS.get(choice, (False, False))
 
     success_qty = None
     success_note = None
@@ -240,9 +243,17 @@ def _sanitize_text_block(text: str) -> str:
     return " ".join(kept).strip()
 
 
+_DESC_HEADER_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+
 def sanitize_description_html(html_str: str) -> str:
+    return _sanitize_description(html_str)[0]
+
+
+def _sanitize_description(html_str: str) -> Tuple[str, bool]:
+    """Return the cleaned HTML and whether it already has a description heading, from one parse."""
     if not html_str:
-        return ""
+        return "", False
     try:
         from bs4 import BeautifulSoup, NavigableString
         soup = BeautifulSoup(html_str, "html.parser")
@@ -268,29 +279,35 @@ def sanitize_description_html(html_str: str) -> str:
                     text_node.replace_with(new_text)
                     
         # Clean up empty parent tags if they ended up empty after stripping text
-        # e.g., if a <span> or <p> has no children/text left, but keep tags wrapping media/br
-        for _ in range(3):
-            for tag in list(soup.find_all(True)):
-                if tag.name in ['br', 'img']:
-                    continue
-                if not tag.contents:
-                    tag.extract()
-                    continue
-                # If tag contains only whitespace text nodes (no visible content, no images, no brs)
-                has_visible_media = tag.find(['img', 'br']) is not None
-                if not has_visible_media and not tag.get_text(strip=True):
-                    tag.extract()
-
-        return "".join([str(c) for c in soup.contents]).strip()
+        # e.g., if a <span> or <p> has no children/text left, but keep tags wrapping media/br.
+        # The text/media test covers the whole subtree, so one top-down pass removes nested
+        # empty wrappers too; removing them never changes the verdict for an ancestor.
+        for tag in list(soup.find_all(True)):
+            # Descendants of a removed wrapper need no further checks
+            if tag.decomposed or tag.name in ['br', 'img']:
+                continue
+            if not tag.contents:
+                tag.decompose()
+                continue
+            # If tag contains only whitespace text nodes (no visible content, no images, no brs)
+            has_visible_media = tag.find(['img', 'br']) is not None
+            if not has_visible_media and not tag.get_text(strip=True):
+                tag.decompose()
+
+        has_desc_header = any(
+            h.get_text(strip=True).lower() in ('description', 'product description')
+            for h in soup.find_all(_DESC_HEADER_TAGS)
+        )
+        return "".join([str(c) for c in soup.contents]).strip(), has_desc_header
     except Exception:
-        return html_str
+        return html_str, False
 
 
 def esc_xml(s: str) -> str:
     return (s or "").replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
 
 
-def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
+def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge, tokens: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     io.log("Preparing eBay listing payload…")
 
     amazon_open = False
@@ -392,22 +409,22 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
     image_urls_array = data.get('imageUrls', []) or []
 
     # --- HTML Description ---
-    # --- HTML Description ---
+    # Sections are collected in a list and joined once at the end rather than re-concatenated.
     # Use the full title in the HTML description so it is not cropped there.
-    html_description = f"<h1>{title_for_description}</h1> <br>"
+    html_parts = [f"<h1>{title_for_description}</h1> <br>"]
 
     product_overview = data.get('productOverview', {}) or {}
     if product_overview:
-        html_description += '<table style="border: none; border-collapse: collapse;">'
+        html_parts.append('<table style="border: none; border-collapse: collapse;">')
         for key, value in product_overview.items():
             safe_val = _sanitize_text_block(str(value))
             if not safe_val:
                 continue  # skip empty after sanitising
-            html_description += (
+            html_parts.append(
                 f'<tr><td style="border: none;"><b>{esc_xml(str(key))}:</b></td>'
                 f'<td style="border: none;">{esc_xml(safe_val)}</td></tr>'
             )
-        html_description += '</table><br>'
+        html_parts.append('</table><br>')
 
     featured_bullets = data.get('featuredBullets', []) or []
     if featured_bullets:
@@ -424,29 +441,18 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
             else:
                 cleaned_bullets.append(item)
         if cleaned_bullets:
-            html_description += '<ul>'
+            html_parts.append('<ul>')
             for item in cleaned_bullets:
-                html_description += f'<li>{esc_xml(item)}</li>'
-            html_description += '</ul><br>'
+                html_parts.append(f'<li>{esc_xml(item)}</li>')
+            html_parts.append('</ul><br>')
 
     # Product description
     product_desc_html = ""
     amazon_description = data.get('description', '') or ''
     if amazon_description:
-        safe_description = sanitize_description_html(amazon_description)
+        # The heading check reuses the sanitiser's soup instead of re-parsing its output
+        safe_description, has_desc_header = _sanitize_description(amazon_description)
         if safe_description:
-            from bs4 import BeautifulSoup
-            try:
-                temp_soup = BeautifulSoup(safe_description, 'html.parser')
-                has_desc_header = False
-                for h in temp_soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                    h_text = h.get_text(strip=True).lower()
-                    if h_text in ['description', 'product description']:
-                        has_desc_header = True
-                        break
-            except Exception:
-                has_desc_header = False
-
             if not has_desc_header:
                 product_desc_html += '<h3>Product Description</h3>'
             product_desc_html += f'{safe_description}<br><br>'
@@ -459,17 +465,17 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
         merged = dict(prod_details)
         merged.update({k: v for k, v in product_details.items() if k != 'FactsList'})
         if merged:
-            html_description += '<h3>Product details</h3>'
-            html_description += '<table style="background-color: #f2f2f2; border: 1px solid black; border-collapse: collapse; color: black;">'
+            html_parts.append('<h3>Product details</h3>')
+            html_parts.append('<table style="background-color: #f2f2f2; border: 1px solid black; border-collapse: collapse; color: black;">')
             for key, value in merged.items():
                 safe_val = _sanitize_text_block(str(value))
                 if not safe_val:
                     continue
-                html_description += (
+                html_parts.append(
                     f'<tr><td style="border: 1px solid black; padding: 5px;"><b>{esc_xml(str(key))}</b></td>'
                     f'<td style="border: 1px solid black; padding: 5px;">{esc_xml(safe_val)}</td></tr>'
                 )
-            html_description += '</table>'
+            html_parts.append('</table>')
         # Optional bullets list under product details
         facts_list = product_details.get('FactsList', '') or ''
         if isinstance(facts_list, str) and facts_list.strip():
@@ -481,10 +487,10 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
                 if t:
                     cleaned.append(t)
             if cleaned:
-                html_description += '<ul>'
+                html_parts.append('<ul>')
                 for b in cleaned:
-                    html_description += f'<li>{esc_xml(b)}</li>'
-                html_description += '</ul>'
+                    html_parts.append(f'<li>{esc_xml(b)}</li>')
+                html_parts.append('</ul>')
 
     # New: What's in the box section
     whats_in_box = data.get('whatIsInTheBox', []) or []
@@ -496,33 +502,34 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
             if t:
                 cleaned.append(t)
         if cleaned:
-            html_description += '<br><h3>What is in the box:</h3>'
-            html_description += '<ul>'
+            html_parts.append('<br><h3>What is in the box:</h3>')
+            html_parts.append('<ul>')
             for x in cleaned:
-                html_description += f'<li>{esc_xml(x)}</li>'
-            html_description += '</ul>'
+                html_parts.append(f'<li>{esc_xml(x)}</li>')
+            html_parts.append('</ul>')
 
     important_information = data.get('importantInformation', "") or ""
     if important_information:
         safe_info = _sanitize_text_block(important_information)
         if safe_info:
-            html_description += safe_info
+            html_parts.append(safe_info)
 
     detail_Bullets = data.get('detailBullets', {}) or {}
     if detail_Bullets:
-        html_description += '<table style="border: none; border-collapse: collapse;">'
+        html_parts.append('<table style="border: none; border-collapse: collapse;">')
         for key, value in detail_Bullets.items():
             safe_val = _sanitize_text_block(str(value))
             if not safe_val:
                 continue
-            html_description += (
+            html_parts.append(
                 f'<tr><td style="border: none;"><b>{esc_xml(str(key))}</b></td>'
                 f'<td style="border: none;">{esc_xml(safe_val)}</td></tr>'
             )
-        html_description += '</table><br>'
+        html_parts.append('</table><br>')
 
     if product_desc_html:
-        html_description += product_desc_html
+        html_parts.append(product_desc_html)
+    html_description = "".join(html_parts)
 
     # --- Credentials & tokens ---
     app_id = os.getenv("EBAY_CLIENT_ID")
@@ -530,8 +537,10 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
     dev_id = os.getenv("EBAY_DEV_ID")
 
     try:
-        with open('ebay_tokens.json', 'r', encoding='utf-8') as f:
-            tokens = json.load(f)
+        # Callers that already ensured auth (e.g. bulk runs) pass tokens in; otherwise use the
+        # tokens module's reader so the file format and its parse cache live in one place
+        if tokens is None:
+            tokens = load_tokens()
         user_token = tokens['user_token']['access_token']
         applicationToken = tokens['application_token']['access_token']
     except (FileNotFoundError, KeyError) as e:
@@ -643,7 +652,7 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
         }
 
         io.log("Sending eBay AddItem request…")
-        response = requests.post(endpoint, data=xml_body.encode('utf-8'), headers=headers)
+        response = EBAY_SESSION.post(endpoint, data=xml_body.encode('utf-8'), headers=headers)
         io.log(f"HTTP Status Code: {response.status_code}")
 
         result: Dict[str, Any] = {"ok": False, "status": response.status_code, "response": response.text}
@@ -911,7 +920,7 @@ def _list_on_ebay_impl(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
     return {"ok": False, "error": "max_retries"}
 
 
-def list_on_ebay(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
+def list_on_ebay(data: Dict[str, Any], io: IOBridge, tokens: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Wrapper around the original listing implementation that captures all logs
     emitted through `io.log` and saves a JSON-lines log record to
@@ -925,7 +934,8 @@ def list_on_ebay(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
       - seller_note
       - logs (list of timestamped log lines)
     This wrapper restores `io.log` after the run and ensures the log file
-    directory exists.
+    directory exists. `tokens` may carry an already-loaded token dict; when
+    omitted the implementation reads ebay_tokens.json itself.
     """
     logs_accum: list[str] = []
     original_log = getattr(io, "log", lambda m: None)
@@ -951,7 +961,7 @@ def list_on_ebay(data: Dict[str, Any], io: IOBridge) -> Dict[str, Any]:
     try:
         try:
             # Call the real implementation (renamed below)
-            result = _list_on_ebay_impl(data, io)
+            result = _list_on_ebay_impl(data, io, tokens)
         except Exception as exc:
             # Ensure we capture unexpected exceptions and return a dict-shaped error
             import traceback
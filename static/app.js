@@ -20,6 +20,7 @@ const elements = {
     promptSelect: document.getElementById("promptSelect"),
     promptOk: document.getElementById("promptOk"),
     promptCancel: document.getElementById("promptCancel"),
+    promptDatalist: document.getElementById("promptDatalist"),
     toggleLogBtn: document.getElementById("toggleLogBtn"),
     logView: document.getElementById("logView"),
     statusBadge: document.getElementById("statusBadge"),
@@ -40,6 +41,12 @@ let bulkPreviewTimeout = null;
 let bulkPreviewGeneration = 0;
 let updatesAbortController = null;
 let cancelPressed = false;
+let pendingLogLines = [];
+let logChunkSizes = [];
+let logLineCount = 0;
+let logFlushScheduled = false;
+let renderedBulkItemsKey = null;
+let appliedControlsKey = null;
 
 const BULK_STATUS_TONES = {
     Ready: "idle",
@@ -51,26 +58,21 @@ const BULK_STATUS_TONES = {
 };
 const INITIAL_RETRY_DELAY = 500;
 const MAX_RETRY_DELAY = 8000;
-
-// Helper to show/hide the small status spinner next to the status badge
+const MAX_LOG_LINES = 1000;
+
+// Helper to show/hide the small status spinner next to the status badge.
+// refreshState calls it on every update, so only touch the DOM when visibility changes.
+function setSpinnerVisible(visible) {
+    const spinner = elements && elements.loadingSpinner;
+    if (!spinner || spinner.hidden === !visible) return;
+    spinner.hidden = !visible;
+    spinner.setAttribute('aria-hidden', visible ? 'false' : 'true');
+}
 function showSpinner() {
-    if (!elements || !elements.loadingSpinner) return;
-    try {
-        elements.loadingSpinner.hidden = false;
-        elements.loadingSpinner.setAttribute('aria-hidden', 'false');
-    } catch (e) {
-        // ignore
-    }
+    setSpinnerVisible(true);
 }
-
 function hideSpinner() {
-    if (!elements || !elements.loadingSpinner) return;
-    try {
-        elements.loadingSpinner.hidden = true;
-        elements.loadingSpinner.setAttribute('aria-hidden', 'true');
-    } catch (e) {
-        // ignore
-    }
+    setSpinnerVisible(false);
 }
 
 async function postJson(url, payload) {
@@ -96,10 +98,14 @@ async function postJson(url, payload) {
     return { response, data };
 }
 
+// Byte -> two-digit hex lookup, built once rather than on every generateUuid() call
+const HEX_BYTES = [...Array(256)].map((_, i) => (i).toString(16).padStart(2, '0'));
+const randomByte = () => Math.random() * 256 | 0;
+
 function generateUuid() {
     // Simple UUID v4 generator (non-crypto) for window scoping
-    const hex = [...Array(256)].map((_, i) => (i).toString(16).padStart(2, '0'));
-    const r = () => Math.random() * 256 | 0;
+    const hex = HEX_BYTES;
+    const r = randomByte;
     return (
         hex[r()] + hex[r()] + '-' +
         hex[r()] + '-' +
@@ -180,13 +186,42 @@ function openExternal(url) {
     }, 600);
 }
 
+// Tab/panel pairs keyed by panel id, so switching only touches the outgoing and incoming pair
+const tabPanels = new Map();
+elements.panelBodies.forEach((panel) => {
+    tabPanels.set(panel.id, { tab: null, panel });
+});
+elements.panelTabs.forEach((tab) => {
+    const entry = tabPanels.get(tab.dataset.target);
+    if (entry) {
+        entry.tab = tab;
+    }
+});
+let activeTabTarget = null;
+
+function setTabPanelActive(targetId, active) {
+    const entry = tabPanels.get(targetId);
+    if (!entry) {
+        return;
+    }
+    if (entry.tab) {
+        entry.tab.classList.toggle("active", active);
+    }
+    entry.panel.classList.toggle("active", active);
+}
+
 function toggleTabPanel(targetId) {
-    elements.panelTabs.forEach((tab) => {
-        tab.classList.toggle("active", tab.dataset.target === targetId);
-    });
-    elements.panelBodies.forEach((panel) => {
-        panel.classList.toggle("active", panel.id === targetId);
-    });
+    if (targetId === activeTabTarget) {
+        return;
+    }
+    if (activeTabTarget === null) {
+        // First switch: clear whatever the template marked active
+        tabPanels.forEach((_, id) => setTabPanelActive(id, false));
+    } else {
+        setTabPanelActive(activeTabTarget, false);
+    }
+    setTabPanelActive(targetId, true);
+    activeTabTarget = targetId;
     if (elements.bulkPreview) {
         elements.bulkPreview.hidden = targetId !== "bulk-panel";
     }
@@ -199,7 +234,7 @@ function showPrompt(prompt) {
     elements.promptLabel.textContent = prompt.prompt;
 
     // Clear previous datalist if present
-    const datalist = document.getElementById('promptDatalist');
+    const datalist = elements.promptDatalist;
 
     if (prompt.type === "choice") {
         // Strict choice -> show select only, hide text input suggestions
@@ -286,6 +321,7 @@ function clearBulkItemsUI() {
     if (elements.bulkItems) {
         elements.bulkItems.innerHTML = "";
     }
+    renderedBulkItemsKey = null;
     if (elements.bulkMeta) {
         elements.bulkMeta.textContent = "Paste bulk text to preview items.";
     }
@@ -301,10 +337,12 @@ function clearBulkItemsUI() {
     if (elements.bulkProcessBtn) {
         elements.bulkProcessBtn.disabled = false;
     }
+    appliedControlsKey = null;
 }
 
 async function cancelPublishingAndCleanup() {
     cancelPressed = true;
+    appliedControlsKey = null;
     
     // UI update instantly: hide cancel button, show reset workspace button
     if (elements.cancelAllBtn) {
@@ -360,6 +398,33 @@ async function refreshPrompt() {
     }
 }
 
+// Append buffered log lines in one DOM write per animation frame instead of
+// re-serialising the whole log view for every entry.
+function flushLogBuffer() {
+    logFlushScheduled = false;
+    if (!pendingLogLines.length) {
+        return;
+    }
+    const chunk = document.createTextNode(`${pendingLogLines.join("\n")}\n`);
+    logChunkSizes.push(pendingLogLines.length);
+    logLineCount += pendingLogLines.length;
+    pendingLogLines = [];
+    elements.logView.appendChild(chunk);
+    // Drop the oldest chunks once the view holds more than MAX_LOG_LINES lines
+    while (logLineCount > MAX_LOG_LINES && logChunkSizes.length > 1 && elements.logView.firstChild) {
+        elements.logView.removeChild(elements.logView.firstChild);
+        logLineCount -= logChunkSizes.shift();
+    }
+    elements.logView.scrollTop = elements.logView.scrollHeight;
+}
+
+function clearLogView() {
+    pendingLogLines = [];
+    logChunkSizes = [];
+    logLineCount = 0;
+    elements.logView.textContent = "";
+}
+
 async function refreshLogs() {
     const response = await fetch(`/api/logs?since=${lastLogId}`);
     if (!response.ok) {
@@ -367,11 +432,70 @@ async function refreshLogs() {
     }
     const data = await response.json();
     data.entries.forEach((entry) => {
-        elements.logView.textContent += `${entry.message}\n`;
+        pendingLogLines.push(entry.message);
     });
+    // Only the newest MAX_LOG_LINES can ever be shown, so the buffer never needs more,
+    // however long a flush is delayed
+    if (pendingLogLines.length > MAX_LOG_LINES) {
+        pendingLogLines.splice(0, pendingLogLines.length - MAX_LOG_LINES);
+    }
     lastLogId = data.last_id;
-    if (data.entries.length) {
-        elements.logView.scrollTop = elements.logView.scrollHeight;
+    if (pendingLogLines.length && !logFlushScheduled) {
+        logFlushScheduled = true;
+        // requestAnimationFrame doesn't fire in a background tab; flush on a timer there
+        if (document.hidden) {
+            setTimeout(flushLogBuffer, 0);
+        } else {
+            requestAnimationFrame(flushLogBuffer);
+        }
+    }
+}
+
+// Button enabled/visible state only changes when the busy state flips, so skip the DOM
+// writes on the many refreshes (one per log line) where none of the inputs moved.
+function applyControlState(processing, productLoaded, running, paused) {
+    const isProcessing = processing || running;
+    if (isProcessing) {
+        cancelPressed = false;
+    }
+    const key = `${processing}|${productLoaded}|${running}|${paused}|${cancelPressed}`;
+    if (key === appliedControlsKey) {
+        return;
+    }
+    appliedControlsKey = key;
+
+    elements.listBtn.disabled = !productLoaded || processing;
+    elements.scrapeBtn.disabled = processing;
+    elements.authBtn.disabled = processing;
+    elements.logoutBtn.disabled = processing;
+    elements.bulkProcessBtn.disabled = running;
+    elements.bulkPauseBtn.hidden = !running;
+    elements.bulkPauseBtn.textContent = paused ? "Resume" : "Pause";
+
+    // Dynamic visibility for Cancel All and Reset Workspace buttons
+    if (isProcessing) {
+        if (elements.cancelAllBtn) {
+            elements.cancelAllBtn.hidden = false;
+            elements.cancelAllBtn.style.display = "inline-block";
+        }
+        if (elements.resetWorkspaceBtn) {
+            elements.resetWorkspaceBtn.hidden = true;
+            elements.resetWorkspaceBtn.style.display = "none";
+        }
+    } else {
+        if (elements.cancelAllBtn) {
+            elements.cancelAllBtn.hidden = true;
+            elements.cancelAllBtn.style.display = "none";
+        }
+        if (elements.resetWorkspaceBtn) {
+            if (cancelPressed) {
+                elements.resetWorkspaceBtn.hidden = false;
+                elements.resetWorkspaceBtn.style.display = "inline-block";
+            } else {
+                elements.resetWorkspaceBtn.hidden = true;
+                elements.resetWorkspaceBtn.style.display = "none";
+            }
+        }
     }
 }
 
@@ -381,10 +505,6 @@ async function refreshState() {
         return;
     }
     const data = await response.json();
-    elements.listBtn.disabled = !data.product_loaded || data.processing;
-    elements.scrapeBtn.disabled = data.processing;
-    elements.authBtn.disabled = data.processing;
-    elements.logoutBtn.disabled = data.processing;
 
     const status = data.status || {};
     const statusLabel = status.label || (data.processing ? "Working" : "Idle");
@@ -407,9 +527,7 @@ async function refreshState() {
 
     const bulk = data.bulk || {};
     const running = Boolean(bulk.running);
-    elements.bulkProcessBtn.disabled = running;
-    elements.bulkPauseBtn.hidden = !running;
-    elements.bulkPauseBtn.textContent = bulk.paused ? "Resume" : "Pause";
+    applyControlState(Boolean(data.processing), Boolean(data.product_loaded), running, Boolean(bulk.paused));
     if (elements.bulkMeta) {
         const total = bulk.total || 0;
         const processed = bulk.processed || 0;
@@ -422,34 +540,6 @@ async function refreshState() {
         renderBulkItems(bulk.items || []);
     }
 
-    // Dynamic visibility for Cancel All and Reset Workspace buttons
-    const isProcessing = data.processing || running;
-    if (isProcessing) {
-        cancelPressed = false;
-        if (elements.cancelAllBtn) {
-            elements.cancelAllBtn.hidden = false;
-            elements.cancelAllBtn.style.display = "inline-block";
-        }
-        if (elements.resetWorkspaceBtn) {
-            elements.resetWorkspaceBtn.hidden = true;
-            elements.resetWorkspaceBtn.style.display = "none";
-        }
-    } else {
-        if (elements.cancelAllBtn) {
-            elements.cancelAllBtn.hidden = true;
-            elements.cancelAllBtn.style.display = "none";
-        }
-        if (elements.resetWorkspaceBtn) {
-            if (cancelPressed) {
-                elements.resetWorkspaceBtn.hidden = false;
-                elements.resetWorkspaceBtn.style.display = "inline-block";
-            } else {
-                elements.resetWorkspaceBtn.hidden = true;
-                elements.resetWorkspaceBtn.style.display = "none";
-            }
-        }
-    }
-
     return data;
 }
 
@@ -543,7 +633,7 @@ elements.jsonFile.addEventListener("change", async (event) => {
 });
 
 elements.authBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const { response, data } = await postJson("/api/auth");
     if (!response.ok) {
         alert(data.error || "Failed to start auth.");
@@ -551,7 +641,7 @@ elements.authBtn.addEventListener("click", async () => {
 });
 
 elements.logoutBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const { response, data } = await postJson("/api/logout");
     if (!response.ok) {
         alert(data.error || "Failed to logout.");
@@ -559,7 +649,7 @@ elements.logoutBtn.addEventListener("click", async () => {
 });
 
 elements.scrapeBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const payload = {
         url: elements.amazonUrl.value,
         quantity: elements.quantity.value,
@@ -573,7 +663,7 @@ elements.scrapeBtn.addEventListener("click", async () => {
 });
 
 elements.listBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const { response, data } = await postJson("/api/list");
     if (!response.ok) {
         alert(data.error || "Failed to list item.");
@@ -581,7 +671,7 @@ elements.listBtn.addEventListener("click", async () => {
 });
 
 elements.bulkProcessBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const { response, data } = await postJson("/api/bulk/process", { text: elements.bulkText.value });
     if (!response.ok) {
         alert(data.error || "Failed to start bulk processing.");
@@ -589,7 +679,7 @@ elements.bulkProcessBtn.addEventListener("click", async () => {
 });
 
 elements.bulkPauseBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const { response, data } = await postJson("/api/bulk/pause");
     if (!response.ok) {
         alert(data.error || "Failed to toggle bulk pause.");
@@ -600,7 +690,7 @@ elements.bulkPauseBtn.addEventListener("click", async () => {
 
 // Cancel All Operations click handler
 elements.cancelAllBtn.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const result = await cancelPublishingAndCleanup();
     if (!result.ok) {
         alert(result.data.error || "Failed to cancel operations.");
@@ -612,7 +702,7 @@ elements.resetWorkspaceBtn.addEventListener("click", async () => {
     if (!confirm("Are you sure you want to reset the workspace? This will clear all temporary products, bulk lists, and images (log files will not be touched).")) {
         return;
     }
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const response = await fetch("/api/reset-workspace", { method: "POST" });
     if (response.ok) {
         cancelPressed = false;
@@ -625,7 +715,7 @@ elements.resetWorkspaceBtn.addEventListener("click", async () => {
         elements.bulkText.value = "";
         
         // Clear activity log and bulk list previews
-        elements.logView.textContent = "";
+        clearLogView();
         clearBulkItemsUI();
         await refreshState();
     } else {
@@ -635,7 +725,7 @@ elements.resetWorkspaceBtn.addEventListener("click", async () => {
 
 // When user clicks Cancel on the prompt, cancel publishing and cleanup
 elements.promptCancel.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const result = await cancelPublishingAndCleanup();
     if (!result.ok) {
         alert(result.data.error || "Failed to cancel operations.");
@@ -643,7 +733,7 @@ elements.promptCancel.addEventListener("click", async () => {
 });
 
 elements.promptOk.addEventListener("click", async () => {
-    try { showSpinner(); } catch (e) {}
+    showSpinner();
     const value = lastPromptType === "choice" ? elements.promptSelect.value : elements.promptInput.value;
     await submitPrompt(value);
 });
@@ -683,6 +773,13 @@ function renderBulkItems(items) {
     if (!elements.bulkItems) {
         return;
     }
+    // refreshState runs on every server update (including each log line), so only
+    // rebuild the cards when the items actually changed since the last render.
+    const itemsKey = JSON.stringify(items || []);
+    if (itemsKey === renderedBulkItemsKey) {
+        return;
+    }
+    renderedBulkItemsKey = itemsKey;
     elements.bulkItems.innerHTML = "";
     if (!items || items.length === 0) {
         const empty = document.createElement("div");
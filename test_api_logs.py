@@ -0,0 +1,49 @@
+from collections import deque
+
+import pytest
+
+import web_app
+
+MAXLEN = 5
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Ids 1..12 appended to a 5-slot deque: 1..7 have been evicted, 8..12 remain
+    entries = deque(maxlen=MAXLEN)
+    for entry_id in range(1, 13):
+        entries.append({"id": entry_id, "message": f"line {entry_id}"})
+    monkeypatch.setattr(web_app, "LOG_ENTRIES", entries)
+    return web_app.app.test_client()
+
+
+def _fetch(client, since):
+    payload = client.get(f"/api/logs?since={since}").get_json()
+    return [entry["id"] for entry in payload["entries"]], payload["last_id"]
+
+
+def test_since_zero_returns_everything_retained(client):
+    assert _fetch(client, 0) == ([8, 9, 10, 11, 12], 12)
+
+
+def test_since_older_than_the_oldest_retained_entry(client):
+    # The client missed evicted lines; it gets what is still held, not a gap or an error
+    assert _fetch(client, 3) == ([8, 9, 10, 11, 12], 12)
+    assert _fetch(client, 7) == ([8, 9, 10, 11, 12], 12)
+
+
+def test_since_inside_the_retained_window(client):
+    assert _fetch(client, 8) == ([9, 10, 11, 12], 12)
+    assert _fetch(client, 11) == ([12], 12)
+
+
+def test_since_at_or_past_the_newest_id(client):
+    assert _fetch(client, 12) == ([], 12)
+    # e.g. a tab still holding ids from before a workspace reset
+    assert _fetch(client, 500) == ([], 12)
+
+
+def test_empty_log_echoes_since(monkeypatch):
+    monkeypatch.setattr(web_app, "LOG_ENTRIES", deque(maxlen=MAXLEN))
+    client = web_app.app.test_client()
+    assert _fetch(client, 4) == ([], 4)
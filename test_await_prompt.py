@@ -0,0 +1,16 @@
+import web_app
+
+
+def test_unanswered_prompt_falls_back_to_default(monkeypatch, tmp_path):
+    monkeypatch.setattr(web_app, "PROMPT_TIMEOUT_SECONDS", 0.05)
+    # The timeout is logged; keep the activity log out of the working tree
+    monkeypatch.setattr(web_app, "ACTIVITY_LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(web_app, "ACTIVITY_LOG_TXT", str(tmp_path / "activity_log.txt"))
+    web_app.cancellation_event.clear()
+
+    assert web_app._await_prompt("text", "Enter a price", "9.99", []) == "9.99"
+    # The abandoned prompt is cleared so the UI stops showing it
+    assert web_app.ACTIVE_PROMPT is None
+    assert web_app.PROMPT_EVENTS == {}
+    # Let the queued log write land while the temp log path is still patched in
+    web_app.DISK_WRITER.join()
@@ -0,0 +1,53 @@
+import pytest
+
+from web_app import _parse_custom_specifics
+
+
+def _split_parse(raw):
+    # The split-based parser _CUSTOM_SPEC_RE replaced; the regex must agree with it
+    custom_specifics = {}
+    for part in raw.split("|"):
+        if ":" in part:
+            key, value = part.split(":", 1)
+            if key.strip() and value.strip():
+                custom_specifics[key.strip()] = value.strip()
+    return custom_specifics
+
+
+CASES = [
+    ("", {}),
+    ("Size: Large", {"Size": "Large"}),
+    ("Size: Large | Colour: Blue", {"Size": "Large", "Colour": "Blue"}),
+    # empty keys and empty values are dropped
+    (": Blue", {}),
+    ("  : Blue | Size: Large", {"Size": "Large"}),
+    ("Size: | Colour: Blue", {"Colour": "Blue"}),
+    # the value keeps any further colons
+    ("Ratio: 16:9", {"Ratio": "16:9"}),
+    ("Time: 10:30:00 | Plug: UK", {"Time": "10:30:00", "Plug": "UK"}),
+    ("Note::x", {"Note": ":x"}),
+    # parts without a colon are skipped
+    ("Large | Colour: Blue", {"Colour": "Blue"}),
+    ("no colon at all", {}),
+    # leading, trailing and doubled pipes
+    ("| Size: Large", {"Size": "Large"}),
+    ("Size: Large |", {"Size": "Large"}),
+    ("|Size: Large||Colour: Blue|", {"Size": "Large", "Colour": "Blue"}),
+    ("||", {}),
+    # embedded newlines are whitespace around keys/values, not separators
+    ("Size: Large\n| Colour: Blue", {"Size": "Large", "Colour": "Blue"}),
+    ("Size\n: Large", {"Size": "Large"}),
+    ("Material: Cotton\nblend", {"Material": "Cotton\nblend"}),
+    # later duplicates win
+    ("Size: S | Size: M", {"Size": "M"}),
+]
+
+
+@pytest.mark.parametrize("raw, expected", CASES)
+def test_parse_custom_specifics(raw, expected):
+    assert _parse_custom_specifics(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [raw for raw, _ in CASES])
+def test_matches_split_parser(raw):
+    assert _parse_custom_specifics(raw) == _split_parse(raw)
@@ -1,5 +1,6 @@
+import io
 import json
-from bulk_parser import parse_bulk_items
+from bulk_parser import iter_bulk_items, parse_bulk_items
 
 text = '''9
 quantity: 4
@@ -15,3 +16,77 @@ print(json.dumps(items, indent=2))
 for it in items:
     print('NOTE REPR:', repr(it['note']))
     print('NOTE RAW:', it['note'])
+
+
+numbered_text = '''1
+https://www.amazon.co.uk/dp/B08N5WRWNW
+Quantity: 2
+Note: Gift item
+Size: Large | Colour: Blue
+
+2
+https://www.amazon.co.uk/dp/B07XYZ1234'''
+
+
+def test_iter_bulk_items_splits_on_number_lines():
+    items = list(iter_bulk_items(io.StringIO(numbered_text)))
+    assert [it['url'] for it in items] == [
+        'https://www.amazon.co.uk/dp/B08N5WRWNW',
+        'https://www.amazon.co.uk/dp/B07XYZ1234',
+    ]
+    assert items[0]['quantity'] == 2
+    assert items[0]['note'] == 'Gift item'
+    assert items[0]['custom_specifics'] == {'Size': 'Large', 'Colour': 'Blue'}
+    assert items[1]['quantity'] == 1
+
+
+def test_iter_bulk_items_ignores_blank_lines_inside_a_block():
+    pasted = text.replace('quantity: 4\n', 'quantity: 4\n\n')
+    items = list(iter_bulk_items(io.StringIO(pasted)))
+    assert len(items) == 1
+    assert items[0]['quantity'] == 4
+
+
+def test_iter_bulk_items_yields_trailing_block_without_final_newline():
+    assert not numbered_text.endswith('\n')
+    items = list(iter_bulk_items(iter(numbered_text.splitlines(keepends=True))))
+    assert items[-1]['url'] == 'https://www.amazon.co.uk/dp/B07XYZ1234'
+
+
+def test_iter_bulk_items_matches_parse_bulk_items():
+    for sample in (text, numbered_text, text + '\n10\n' + numbered_text):
+        assert list(iter_bulk_items(io.StringIO(sample))) == parse_bulk_items(sample)
+
+
+readme_text = '''https://www.amazon.co.uk/dp/B08N5WRWNW
+Quantity: 2
+Note: Gift item
+Size: Large | Colour: Blue
+
+https://www.amazon.co.uk/dp/B07XYZ1234'''
+
+
+def test_blank_line_before_the_next_url_separates_items():
+    items = list(iter_bulk_items(io.StringIO(readme_text)))
+    assert [it['url'] for it in items] == [
+        'https://www.amazon.co.uk/dp/B08N5WRWNW',
+        'https://www.amazon.co.uk/dp/B07XYZ1234',
+    ]
+    assert items[0]['quantity'] == 2
+    assert items[0]['note'] == 'Gift item'
+    assert items[1]['quantity'] == 1
+
+
+def test_blank_line_after_the_url_keeps_the_items_details():
+    items = parse_bulk_items('https://www.amazon.co.uk/dp/B08N5WRWNW\n\nQuantity: 2\nNote: x')
+    assert len(items) == 1
+    assert items[0]['quantity'] == 2
+    assert items[0]['note'] == 'x'
+
+
+def test_lines_between_the_blank_and_the_next_url_go_to_the_next_item():
+    items = parse_bulk_items(
+        'https://www.amazon.co.uk/dp/B08N5WRWNW\nQuantity: 2\n\n'
+        'Quantity: 3\nhttps://www.amazon.co.uk/dp/B07XYZ1234\n'
+    )
+    assert [it['quantity'] for it in items] == [2, 3]
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from web_app import _ReadWriteLock
+
+# Long enough for a thread that is free to proceed to get there; only paid on success paths
+SETTLE_SECONDS = 0.2
+
+
+def _start(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_hold_the_lock_together():
+    lock = _ReadWriteLock()
+    # Both readers must be inside read() at once for the barrier to trip
+    barrier = threading.Barrier(2, timeout=2)
+    results = []
+
+    def reader():
+        with lock.read():
+            barrier.wait()
+            results.append("read")
+
+    threads = [_start(reader) for _ in range(2)]
+    for thread in threads:
+        thread.join(timeout=5)
+    assert results == ["read", "read"]
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = _ReadWriteLock()
+    entered = []
+
+    def reader():
+        with lock.read():
+            entered.append("read")
+
+    def writer():
+        with lock.write():
+            entered.append("write")
+
+    with lock.write():
+        threads = [_start(reader), _start(writer)]
+        time.sleep(SETTLE_SECONDS)
+        assert entered == []
+    for thread in threads:
+        thread.join(timeout=5)
+    assert sorted(entered) == ["read", "write"]
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = _ReadWriteLock()
+    order = []
+
+    def writer():
+        with lock.write():
+            order.append("write")
+
+    def late_reader():
+        with lock.read():
+            order.append("late read")
+
+    with lock.read():
+        writer_thread = _start(writer)
+        time.sleep(SETTLE_SECONDS)
+        # The writer is now queued behind the held read; a new reader must wait behind it
+        reader_thread = _start(late_reader)
+        time.sleep(SETTLE_SECONDS)
+        assert order == []
+    writer_thread.join(timeout=5)
+    reader_thread.join(timeout=5)
+    assert order == ["write", "late read"]
+
+
+@pytest.mark.parametrize("side", ["read", "write"])
+def test_lock_is_released_when_the_block_raises(side):
+    lock = _ReadWriteLock()
+    with pytest.raises(RuntimeError):
+        with getattr(lock, side)():
+            raise RuntimeError("boom")
+    acquired = []
+
+    def writer():
+        with lock.write():
+            acquired.append(True)
+
+    _start(writer).join(timeout=5)
+    assert acquired == [True]
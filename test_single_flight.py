@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+
+import tokens
+from ui_bridge import IOBridge
+
+# Long enough for started waiters to reach _single_flight before the owner is released
+SETTLE_SECONDS = 0.2
+
+
+def _wait_for_inflight(key):
+    deadline = time.monotonic() + 5
+    while key not in tokens._REFRESH_INFLIGHT:
+        assert time.monotonic() < deadline, f"{key} never went in flight"
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_call():
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return {"access_token": "shared"}
+
+    results = []
+
+    def call():
+        results.append(tokens._single_flight("test:shared", fn))
+
+    owner = threading.Thread(target=call)
+    owner.start()
+    _wait_for_inflight("test:shared")
+    waiters = [threading.Thread(target=call) for _ in range(4)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(SETTLE_SECONDS)
+    release.set()
+    for thread in [owner, *waiters]:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [{"access_token": "shared"}] * 5
+    assert "test:shared" not in tokens._REFRESH_INFLIGHT
+
+
+def test_inflight_entry_is_removed_after_an_exception():
+    def failing():
+        raise ValueError("token endpoint down")
+
+    with pytest.raises(ValueError):
+        tokens._single_flight("test:error", failing)
+    assert "test:error" not in tokens._REFRESH_INFLIGHT
+
+    # The next caller starts a fresh call instead of inheriting the failure
+    assert tokens._single_flight("test:error", lambda: "recovered") == "recovered"
+
+
+def test_waiters_receive_the_owners_exception():
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ValueError("token endpoint down")
+
+    errors = []
+
+    def call():
+        try:
+            tokens._single_flight("test:shared-error", failing)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    owner = threading.Thread(target=call)
+    owner.start()
+    _wait_for_inflight("test:shared-error")
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    time.sleep(SETTLE_SECONDS)
+    release.set()
+    owner.join(timeout=5)
+    waiter.join(timeout=5)
+
+    assert errors == ["token endpoint down"] * 2
+
+
+def test_refresh_user_token_returns_none_when_the_wait_times_out(monkeypatch):
+    release = threading.Event()
+
+    def slow_refresh(refresh_token_value, io):
+        release.wait(5)
+        return {"access_token": "late", "refresh_token": refresh_token_value}
+
+    monkeypatch.setattr(tokens, "_request_user_token_refresh", slow_refresh)
+    monkeypatch.setattr(tokens, "TOKEN_REFRESH_WAIT_SECONDS", 0.05)
+
+    owner_result = []
+    owner = threading.Thread(target=lambda: owner_result.append(tokens.refresh_user_token("rt-1", IOBridge())))
+    owner.start()
+    try:
+        _wait_for_inflight("user:rt-1")
+        assert tokens.refresh_user_token("rt-1", IOBridge()) is None
+    finally:
+        release.set()
+        owner.join(timeout=5)
+
+    # The owner is never cut short by a waiter's timeout
+    assert owner_result == [{"access_token": "late", "refresh_token": "rt-1"}]
+
+
+def test_waiter_timeout_in_get_ebay_user_token_does_not_start_a_login(monkeypatch):
+    release = threading.Event()
+    logins = []
+
+    def slow_refresh(refresh_token_value, io):
+        release.wait(5)
+        return {"access_token": "late", "refresh_token": refresh_token_value}
+
+    monkeypatch.setattr(tokens, "_request_user_token_refresh", slow_refresh)
+    monkeypatch.setattr(tokens, "TOKEN_REFRESH_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(tokens, "_start_refresh_worker", lambda: None)
+    monkeypatch.setattr(tokens, "get_user_token_full_flow", lambda io: logins.append(io))
+
+    owner = threading.Thread(target=lambda: tokens.refresh_user_token("rt-2", IOBridge()))
+    owner.start()
+    try:
+        _wait_for_inflight("user:rt-2")
+        stale = {"user_token": {"access_token": "old", "refresh_token": "rt-2", "timestamp": 0, "expires_in": 7200}}
+        assert tokens.get_ebay_user_token(stale, IOBridge()) is None
+    finally:
+        release.set()
+        owner.join(timeout=5)
+
+    assert logins == []
+
+
+def test_refresh_wait_covers_the_owners_worst_case():
+    attempts = tokens.TOKEN_REQUEST_RETRIES + 1
+    worst_case = attempts * sum(tokens.TOKEN_REQUEST_TIMEOUT_SECONDS) + tokens.TOKEN_REQUEST_RETRIES * tokens.TOKEN_RETRY_AFTER_MAX_SECONDS
+    assert tokens.TOKEN_REFRESH_WAIT_SECONDS >= worst_case
@@ -0,0 +1,37 @@
+import time
+
+import tokens
+
+
+def _token(age_seconds, expires_in=7200):
+    token = {"access_token": "t", "expires_in": expires_in}
+    tokens._stamp_token(token)
+    token["timestamp"] -= age_seconds
+    return token
+
+
+def test_jitter_is_drawn_once_per_token():
+    token = _token(0)
+    assert 0 <= token["refresh_jitter"] <= tokens.TOKEN_REFRESH_JITTER_SECONDS
+    # Right at the edge of the refresh window the verdict must not flip between checks
+    token["timestamp"] = time.time() - token["expires_in"] * tokens.TOKEN_REFRESH_FRACTION + token["refresh_jitter"] / 2
+    verdicts = {tokens._token_needs_refresh(token) for _ in range(200)}
+    assert len(verdicts) == 1
+
+
+def test_a_large_min_valid_request_is_capped():
+    # 10 minutes into a 2 hour token: fresh, even for a bulk run estimated at many hours
+    token = _token(600)
+    assert not tokens._token_needs_refresh(token, min_valid_seconds=500 * 60)
+
+
+def test_min_valid_still_applies_below_the_cap():
+    # 1750s left of 3000: fresh by the normal rule, but not enough for a run needing 1790s
+    token = _token(1250, expires_in=3000)
+    assert not tokens._token_needs_refresh(token)
+    assert tokens._token_needs_refresh(token, min_valid_seconds=1790)
+
+
+def test_missing_token_needs_refresh():
+    assert tokens._token_needs_refresh({})
+    assert tokens._token_needs_refresh(None)
@@ -1,23 +1,36 @@
 from __future__ import annotations
 import os
 import json
+import random
 import time
 import base64
+import functools
 import threading
 import tempfile
 import hashlib
 import stat
 import getpass
 import logging
-from typing import Optional
-from urllib.parse import urlparse, parse_qs
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import quote, urlencode
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ui_bridge import IOBridge
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 _ENV_PATH = os.path.join(os.path.dirname(__file__), ".env")
 load_dotenv(dotenv_path=_ENV_PATH)
+# mtime of .env at the last load; -1 forces the first _reload_env to apply override=True
+_ENV_MTIME_NS: Optional[int] = -1
 
 # --- FIX: usage of .strip() ensures no accidental spaces from the .env file ---
 CLIENT_ID = os.getenv("EBAY_CLIENT_ID", "").strip()
@@ -25,107 +38,368 @@ CLIENT_SECRET = os.getenv("EBAY_CLIENT_SECRET", "").strip()
 DEV_ID = os.getenv("EBAY_DEV_ID", "").strip()
 RUNAME = os.getenv("EBAY_RUNAME", "").strip()
 REDIRECT_URI_HOST = os.getenv("EBAY_REDIRECT_URI_HOST", "").strip()
+# Settings the consent flow cannot run without
+_REQUIRED_ENV = ("EBAY_CLIENT_ID", "EBAY_CLIENT_SECRET", "EBAY_DEV_ID", "EBAY_RUNAME", "EBAY_REDIRECT_URI_HOST")
 
 user_SCOPES = "https://api.ebay.com/oauth/api_scope/sell.inventory https://api.ebay.com/oauth/api_scope/sell.marketing https://api.ebay.com/oauth/api_scope/sell.account https://api.ebay.com/oauth/api_scope/sell.fulfillment"
 application_SCOPES = "https://api.ebay.com/oauth/api_scope"
 TOKENS_FILE = "ebay_tokens.json"
 API_ENDPOINT = "https://api.ebay.com/identity/v1/oauth2/token"
+CONSENT_ENDPOINT = "https://auth.ebay.com/oauth2/authorize"
+# (connect, read): a dead route fails in ~3s instead of holding the login thread for the full read timeout
+TOKEN_REQUEST_TIMEOUT_SECONDS = (3.05, 10)
+# Renew tokens once less than this fraction of their lifetime is left (and never later
+# than the margin), with a little jitter so periodic runs don't all refresh together.
+# The jitter is drawn once per token when it is received, so a token's verdict is stable.
+TOKEN_REFRESH_FRACTION = 0.5
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+TOKEN_REFRESH_JITTER_SECONDS = 30
+# Most lifetime a caller can demand via min_valid_seconds; a big bulk estimate would
+# otherwise force a refresh at almost every check. The background worker covers longer runs.
+TOKEN_MIN_VALID_MAX_SECONDS = 1800
+# Retry policy for the repeatable token POSTs (see _SESSION)
+TOKEN_REQUEST_RETRIES = 3
+TOKEN_RETRY_BACKOFF_FACTOR = 0.3
+# eBay's Retry-After on a 429 is honoured, but never for longer than this per retry
+TOKEN_RETRY_AFTER_MAX_SECONDS = 10
+# Longest a caller waits on another thread's refresh. Derived from the owner's worst case:
+# every attempt (1 + retries) runs to the full connect and read timeouts, and every retry
+# sleeps the longest allowed (capped Retry-After, which exceeds the largest backoff step);
+# plus a few seconds for parsing and scheduling.
+TOKEN_REFRESH_WAIT_SECONDS = (
+    (TOKEN_REQUEST_RETRIES + 1) * sum(TOKEN_REQUEST_TIMEOUT_SECONDS)
+    + TOKEN_REQUEST_RETRIES * max(
+        TOKEN_RETRY_AFTER_MAX_SECONDS,
+        TOKEN_RETRY_BACKOFF_FACTOR * 2 ** (TOKEN_REQUEST_RETRIES - 1),
+    )
+    + 5
+)
 
 _OAUTH_CODE_LOCK = threading.Lock()
 _OAUTH_CODE_EVENT = threading.Event()
 _OAUTH_CODE_VALUE: Optional[str] = None
 OAUTH_CODE_TIMEOUT_SECONDS = 600
+# How often to look for a code file written by another process; in-process callbacks
+# wake the waiter immediately through _OAUTH_CODE_EVENT.
+OAUTH_CODE_FILE_POLL_SECONDS = 2.0
 _LOGGER = logging.getLogger(__name__)
+_T = TypeVar("_T")
+# Single-flight bookkeeping: one in-flight token request per kind, shared by all callers
+_REFRESH_LOCK = threading.Lock()
+_REFRESH_INFLIGHT: Dict[str, Future] = {}
+# Serialises writers of TOKENS_FILE; _LAST_SAVED_BLOB is what this process last wrote
+_TOKENS_FILE_LOCK = threading.Lock()
+_LAST_SAVED_BLOB: Optional[bytes] = None
+# Parsed TOKENS_FILE keyed by its (st_mtime_ns, st_size), so unchanged files are not re-read
+_TOKENS_CACHE: Optional[tuple] = None
+# Token endpoint headers, rebuilt only when the client credentials change
+_TOKEN_HEADERS: Dict[str, str] = {}
+_TOKEN_HEADERS_KEY: Optional[tuple] = None
+# Background renewal of the user token, started on first token check
+TOKEN_BACKGROUND_REFRESH_SECONDS = 60
+_REFRESH_WORKER_LOCK = threading.Lock()
+_REFRESH_WORKER: Optional[threading.Thread] = None
 _OAUTH_FILE_LABEL = "amazon-to-ebay-oauth"
 _OAUTH_FILE_FALLBACK_SALT = f"{getpass.getuser()}-{_OAUTH_FILE_LABEL}"
 
 
+class _TokenRetry(Retry):
+    """Retry that honours Retry-After but caps it, so a refresh has a known worst-case duration."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, TOKEN_RETRY_AFTER_MAX_SECONDS)
+
+
+def _build_session(retry: Retry) -> requests.Session:
+    """Keep-alive session for the OAuth token endpoint."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+# Client-credentials and refresh-token POSTs can be repeated without side effects, so they
+# also retry read errors and 5xx; 429 waits out eBay's Retry-After (capped) before trying again
+_SESSION = _build_session(_TokenRetry(
+    total=TOKEN_REQUEST_RETRIES,
+    backoff_factor=TOKEN_RETRY_BACKOFF_FACTOR,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset({"POST"}),
+    raise_on_status=False,
+))
+# An authorization code is single-use: once eBay has read the request, a retry can only
+# fail with invalid_grant and hide the real error. Retry only failed connects, which
+# never reached the server; a 429 is returned as-is rather than retried after Retry-After.
+_CODE_EXCHANGE_SESSION = _build_session(Retry(
+    total=3,
+    connect=3,
+    read=0,
+    status=0,
+    other=0,
+    backoff_factor=0.3,
+    respect_retry_after_header=False,
+    raise_on_status=False,
+))
+
+
+@functools.lru_cache(maxsize=1)
 def _oauth_code_file_path() -> str:
+    # The salt and temp dir are fixed for the process, so the path is derived once
     salt = _OAUTH_FILE_FALLBACK_SALT
-    token = hashlib.sha256(salt.encode()).hexdigest()
+    token = hashlib.blake2b(salt.encode("utf-8"), digest_size=16).hexdigest()
     return os.path.join(tempfile.gettempdir(), f"amazon_to_ebay_oauth_{token}.txt")
 
 
+def _token_needs_refresh(token_data, min_valid_seconds: float = 0) -> bool:
+    """Return True if a cached token is missing or should be renewed before use.
+
+    `min_valid_seconds` lets long runs (e.g. bulk listing) ask for a token that will
+    outlive them; it is capped at TOKEN_MIN_VALID_MAX_SECONDS (and below a fresh token's
+    lifetime) so it cannot force a refresh on every call.
+    """
+    if not token_data:
+        return True
+    expires_in = float(token_data.get('expires_in', 0) or 0)
+    remaining = float(token_data.get('timestamp', 0) or 0) + expires_in - time.time()
+    threshold = max(
+        TOKEN_REFRESH_MARGIN_SECONDS,
+        expires_in * TOKEN_REFRESH_FRACTION,
+        min(min_valid_seconds, TOKEN_MIN_VALID_MAX_SECONDS, expires_in * 0.9),
+    )
+    return remaining < threshold + float(token_data.get('refresh_jitter', 0) or 0)
+
+
+def _stamp_token(token_data: Dict[str, Any]) -> None:
+    """Record when a token was received and draw its refresh jitter, once."""
+    token_data['timestamp'] = time.time()
+    token_data['refresh_jitter'] = random.uniform(0, TOKEN_REFRESH_JITTER_SECONDS)
+
+
+def _single_flight(key: str, fn: Callable[[], _T], timeout: Optional[float] = None) -> _T:
+    """Run fn() for key unless a call is already in flight; if so, wait for its result.
+
+    `timeout` bounds how long a waiter blocks on someone else's call
+    (concurrent.futures.TimeoutError); the owner always runs fn() to completion.
+    """
+    with _REFRESH_LOCK:
+        future = _REFRESH_INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _REFRESH_INFLIGHT[key] = future
+    if not owner:
+        return future.result(timeout=timeout)
+    try:
+        result = fn()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _REFRESH_LOCK:
+            _REFRESH_INFLIGHT.pop(key, None)
+
+
+def _token_headers() -> Dict[str, str]:
+    """Return the Basic-auth headers for the token endpoint, encoded once per credential pair."""
+    global _TOKEN_HEADERS, _TOKEN_HEADERS_KEY
+    key = (CLIENT_ID, CLIENT_SECRET)
+    if key != _TOKEN_HEADERS_KEY:
+        encoded_credentials = base64.b64encode(f"{CLIENT_ID}:{CLIENT_SECRET}".encode()).decode()
+        _TOKEN_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded', 'Authorization': f'Basic {encoded_credentials}'}
+        _TOKEN_HEADERS_KEY = key
+    return _TOKEN_HEADERS
+
+
 def _reload_env() -> None:
-    global CLIENT_ID, CLIENT_SECRET, DEV_ID, RUNAME, REDIRECT_URI_HOST
+    """Re-read .env, but only when the file changed since the last load."""
+    global CLIENT_ID, CLIENT_SECRET, DEV_ID, RUNAME, REDIRECT_URI_HOST, CONSENT_URL, _ENV_MTIME_NS
+    try:
+        mtime_ns = os.stat(_ENV_PATH).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if mtime_ns == _ENV_MTIME_NS:
+        return
+    _ENV_MTIME_NS = mtime_ns
     load_dotenv(dotenv_path=_ENV_PATH, override=True)
     CLIENT_ID = os.getenv("EBAY_CLIENT_ID", "").strip()
     CLIENT_SECRET = os.getenv("EBAY_CLIENT_SECRET", "").strip()
     DEV_ID = os.getenv("EBAY_DEV_ID", "").strip()
     RUNAME = os.getenv("EBAY_RUNAME", "").strip()
     REDIRECT_URI_HOST = os.getenv("EBAY_REDIRECT_URI_HOST", "").strip()
+    CONSENT_URL = _build_consent_url()
+
+
+def reload_env_config() -> None:
+    """Force a re-read of .env even if its mtime looks unchanged (e.g. on SIGHUP)."""
+    global _ENV_MTIME_NS
+    _ENV_MTIME_NS = -1
+    _reload_env()
+
+
+def _build_consent_url() -> str:
+    # urlencode quotes the space-separated scopes, which the bare f-string left raw
+    query = urlencode({
+        "client_id": CLIENT_ID,
+        "response_type": "code",
+        "redirect_uri": RUNAME,
+        "scope": user_SCOPES,
+    }, quote_via=quote)
+    return f"{CONSENT_ENDPOINT}?{query}"
 
 
-def _poll_oauth_code() -> Optional[str]:
-    """Return any cached OAuth code and clear stale events. Caller must hold _OAUTH_CODE_LOCK."""
+CONSENT_URL = _build_consent_url()
+
+
+def _missing_env() -> list:
+    return [key for key in _REQUIRED_ENV if not os.getenv(key, "").strip()]
+
+
+def _take_oauth_code() -> Optional[str]:
+    """Pop a code delivered in-process. Caller must hold _OAUTH_CODE_LOCK."""
     global _OAUTH_CODE_VALUE
-    if _OAUTH_CODE_VALUE:
-        code = _OAUTH_CODE_VALUE
-        _OAUTH_CODE_VALUE = None
-        _OAUTH_CODE_EVENT.clear()
-        return code
+    # Clear before looking: a later set_oauth_callback_code re-arms the event, so no wakeup is lost
+    _OAUTH_CODE_EVENT.clear()
+    code, _OAUTH_CODE_VALUE = _OAUTH_CODE_VALUE, None
+    return code
+
+
+def _read_oauth_code_file() -> Optional[str]:
+    """Consume a code file written by another process. Needs no lock; the file is per-user."""
     code_file = _oauth_code_file_path()
-    if os.path.exists(code_file):
-        try:
-            mode = stat.S_IMODE(os.stat(code_file).st_mode)
-            # Reject any group/other permissions and owner execute bit for safety.
-            if mode & 0o177:
-                _LOGGER.warning("OAuth code file permissions are insecure; ignoring file.")
-                code = None
-            else:
-                with open(code_file, "r", encoding="utf-8") as handle:
-                    code = handle.read().strip()
-        except OSError:
-            _LOGGER.warning("Failed to read OAuth code file.")
-            code = None
-        try:
-            os.remove(code_file)
-        except OSError:
-            _LOGGER.warning("Failed to remove OAuth code file.")
-        if code:
-            _OAUTH_CODE_EVENT.clear()
-            return code
-    if _OAUTH_CODE_EVENT.is_set():
-        _OAUTH_CODE_EVENT.clear()
-    return None
+    # Open first and check the open descriptor: no separate existence probe, and the file
+    # checked is the file read (O_NOFOLLOW refuses a symlink swapped in where supported)
+    try:
+        fd = os.open(code_file, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except FileNotFoundError:
+        return None
+    except OSError:
+        _LOGGER.warning("Failed to open OAuth code file.")
+        return None
+    code = None
+    try:
+        mode = stat.S_IMODE(os.fstat(fd).st_mode)
+        # Reject any group/other permissions and owner execute bit for safety.
+        if mode & 0o177:
+            _LOGGER.warning("OAuth code file permissions are insecure; ignoring file.")
+        else:
+            code = os.read(fd, 4096).decode("utf-8", errors="replace").strip()
+    except OSError:
+        _LOGGER.warning("Failed to read OAuth code file.")
+    finally:
+        os.close(fd)
+    try:
+        os.remove(code_file)
+    except OSError:
+        _LOGGER.warning("Failed to remove OAuth code file.")
+    return code or None
+
+
+def _discard_stale_oauth_code() -> None:
+    with _OAUTH_CODE_LOCK:
+        _take_oauth_code()
+    try:
+        os.remove(_oauth_code_file_path())
+    except FileNotFoundError:
+        pass
+    except OSError:
+        _LOGGER.warning("Failed to remove stale OAuth code file.")
 
 
 def set_oauth_callback_code(code: str) -> None:
     """Allow external web servers to pass the OAuth code back to this module."""
     global _OAUTH_CODE_VALUE
+    # The lock only covers the hand-off itself; the file below is for a waiter in another
+    # process, so its syscalls stay outside the critical section
     with _OAUTH_CODE_LOCK:
         _OAUTH_CODE_VALUE = code
         _OAUTH_CODE_EVENT.set()
+    try:
+        code_file = _oauth_code_file_path()
+        for _ in range(2):
+            try:
+                os.remove(code_file)
+            except FileNotFoundError:
+                pass
+            try:
+                fd = os.open(code_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(code)
+            break
+        else:
+            _LOGGER.warning("OAuth code file already exists; unable to write.")
+    except OSError:
+        _LOGGER.warning("Failed to write OAuth code file.")
+
+
+def _dump_tokens(tokens) -> bytes:
+    """Serialise the token dict compactly, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(tokens)
+    return json.dumps(tokens, separators=(",", ":")).encode("utf-8")
+
+
+def _write_tokens_file(blob: bytes) -> None:
+    """Atomically replace TOKENS_FILE with blob. Caller must hold _TOKENS_FILE_LOCK."""
+    global _LAST_SAVED_BLOB
+    # A unique temp name per write keeps two processes from clobbering each other's staging
+    # file; mkstemp also creates it 0600, so the tokens are never world-readable, even briefly.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(TOKENS_FILE)), prefix=".ebay_tokens_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+            # Make the data durable before the rename publishes it; otherwise a crash can
+            # leave an empty ebay_tokens.json behind the atomic replace
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, TOKENS_FILE)
+    except BaseException:
         try:
-            code_file = _oauth_code_file_path()
-            for _ in range(2):
-                try:
-                    os.remove(code_file)
-                except FileNotFoundError:
-                    pass
-                try:
-                    fd = os.open(code_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
-                except FileExistsError:
-                    continue
-                with os.fdopen(fd, "w", encoding="utf-8") as handle:
-                    handle.write(code)
-                break
-            else:
-                _LOGGER.warning("OAuth code file already exists; unable to write.")
+            os.remove(tmp_path)
         except OSError:
-            _LOGGER.warning("Failed to write OAuth code file.")
+            pass
+        raise
+    _LAST_SAVED_BLOB = blob
+    _cache_tokens(os.stat(TOKENS_FILE), _loads(blob))
 
 
 def save_tokens(tokens, io: IOBridge):
-    with open(TOKENS_FILE, 'w') as f:
-        json.dump(tokens, f, indent=4)
+    blob = _dump_tokens(tokens)
+    with _TOKENS_FILE_LOCK:
+        if blob == _LAST_SAVED_BLOB and os.path.exists(TOKENS_FILE):
+            return
+        _write_tokens_file(blob)
     io.log("Token data saved.")
 
 
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _cache_tokens(file_stat: os.stat_result, tokens) -> None:
+    global _TOKENS_CACHE
+    _TOKENS_CACHE = ((file_stat.st_mtime_ns, file_stat.st_size), tokens)
+
+
 def load_tokens():
+    """Return the saved tokens; callers get their own top-level dict to modify."""
     try:
-        with open(TOKENS_FILE, 'r') as f:
-            return json.load(f)
+        file_stat = os.stat(TOKENS_FILE)
+        cached = _TOKENS_CACHE
+        if cached is not None and cached[0] == (file_stat.st_mtime_ns, file_stat.st_size):
+            return dict(cached[1])
+        with open(TOKENS_FILE, 'rb') as f:
+            raw = f.read()
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except covers both
+        tokens = _loads(raw)
+        _cache_tokens(file_stat, tokens)
+        return dict(tokens)
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
@@ -138,8 +412,9 @@ def clear_user_token(io: IOBridge) -> bool:
             return True
         if 'user_token' in tokens:
             tokens.pop('user_token', None)
-            with open(TOKENS_FILE, 'w') as f:
-                json.dump(tokens, f, indent=4)
+            blob = _dump_tokens(tokens)
+            with _TOKENS_FILE_LOCK:
+                _write_tokens_file(blob)
             io.log("User token removed.")
         return True
     except Exception as e:
@@ -147,7 +422,7 @@ def clear_user_token(io: IOBridge) -> bool:
         return False
 
 
-def get_application_token(existing_tokens, io: IOBridge):
+def get_application_token(existing_tokens, io: IOBridge, min_valid_seconds: float = 0):
     io.log("Checking application token…")
     _reload_env()
     if not CLIENT_ID or not CLIENT_SECRET:
@@ -155,20 +430,22 @@ def get_application_token(existing_tokens, io: IOBridge):
         return None
     app_token_data = existing_tokens.get('application_token', {})
 
-    if app_token_data and time.time() < app_token_data.get('timestamp', 0) + app_token_data.get('expires_in', 0) - 300:
+    if not _token_needs_refresh(app_token_data, min_valid_seconds):
         io.log("Valid application token exists.")
         return app_token_data
 
+    return _single_flight("application", lambda: _request_application_token(io))
+
+
+def _request_application_token(io: IOBridge):
     io.log("Requesting new application token…")
     try:
-        credentials = f"{CLIENT_ID}:{CLIENT_SECRET}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Authorization': f'Basic {encoded_credentials}'}
+        headers = _token_headers()
         body = {'grant_type': 'client_credentials', 'scope': application_SCOPES}
-        response = requests.post(API_ENDPOINT, headers=headers, data=body)
+        response = _SESSION.post(API_ENDPOINT, headers=headers, data=body, timeout=TOKEN_REQUEST_TIMEOUT_SECONDS)
         response.raise_for_status()
-        new_token_data = response.json()
-        new_token_data['timestamp'] = time.time()
+        new_token_data = _loads(response.content)
+        _stamp_token(new_token_data)
         io.log("New application token received.")
         return new_token_data
     except Exception as e:
@@ -176,25 +453,39 @@ def get_application_token(existing_tokens, io: IOBridge):
         return None
 
 
+def _shared_user_token_refresh(refresh_token_value, io: IOBridge):
+    """Refresh through the single-flight; a waiter that gives up gets FutureTimeoutError."""
+    # Keyed by the refresh token itself, so callers holding a different (e.g. just-rotated)
+    # token are not handed a result for the old one
+    return _single_flight(
+        f"user:{refresh_token_value}",
+        lambda: _request_user_token_refresh(refresh_token_value, io),
+        timeout=TOKEN_REFRESH_WAIT_SECONDS,
+    )
+
+
 def refresh_user_token(refresh_token_value, io: IOBridge):
+    try:
+        return _shared_user_token_refresh(refresh_token_value, io)
+    except FutureTimeoutError:
+        io.log("Timed out waiting for a concurrent token refresh.")
+        return None
+
+
+def _request_user_token_refresh(refresh_token_value, io: IOBridge):
     io.log("Refreshing user access token…")
     _reload_env()
     try:
-        credentials = f"{CLIENT_ID}:{CLIENT_SECRET}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Authorization': f'Basic {encoded_credentials}'
-        }
+        headers = _token_headers()
         body = {
             'grant_type': 'refresh_token',
             'refresh_token': refresh_token_value,
             'scope': user_SCOPES
         }
-        response = requests.post(API_ENDPOINT, headers=headers, data=body)
+        response = _SESSION.post(API_ENDPOINT, headers=headers, data=body, timeout=TOKEN_REQUEST_TIMEOUT_SECONDS)
         response.raise_for_status()
-        refreshed = response.json()
-        refreshed['timestamp'] = time.time()
+        refreshed = _loads(response.content)
+        _stamp_token(refreshed)
 
         if 'refresh_token' not in refreshed:
             refreshed['refresh_token'] = refresh_token_value
@@ -205,40 +496,29 @@ def refresh_user_token(refresh_token_value, io: IOBridge):
         return None
 
 
-def get_user_token_full_flow(io: IOBridge):
-    _reload_env()
-    auth_code = None
-
-    consent_url = f"https://auth.ebay.com/oauth2/authorize?client_id={CLIENT_ID}&response_type=code&redirect_uri={RUNAME}&scope={user_SCOPES}"
-    io.log("Opening browser for eBay consent…")
-    io.open_url(consent_url)
-
-    io.log("Waiting for authorization code (check your browser)…")
-
-    # Polling loop waiting for Flask app to call set_oauth_callback_code
-    deadline = time.monotonic() + OAUTH_CODE_TIMEOUT_SECONDS
-    while not auth_code:
+def _wait_for_code(timeout: float) -> Optional[str]:
+    """Block until the callback delivers a code (in-process or via the code file), or time out."""
+    # Wait for the Flask app to call set_oauth_callback_code (which sets the event)
+    deadline = time.monotonic() + timeout
+    while True:
         with _OAUTH_CODE_LOCK:
-            auth_code = _poll_oauth_code()
-
+            auth_code = _take_oauth_code()
+        if not auth_code:
+            auth_code = _read_oauth_code_file()
         if auth_code:
-            break
+            return auth_code
 
-        if time.monotonic() > deadline:
-            io.log("Timed out waiting for code.")
-            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
 
-        time.sleep(1)
+        _OAUTH_CODE_EVENT.wait(timeout=min(remaining, OAUTH_CODE_FILE_POLL_SECONDS))
 
-    if not auth_code:
-        return None
 
-    io.log("Authorization code received.")
-    io.log("Exchanging code for access token…")
+def _exchange_code(auth_code: str, io: IOBridge) -> Optional[Dict[str, Any]]:
+    """Trade an authorization code for a user token, or return None on failure."""
     try:
-        credentials = f"{CLIENT_ID}:{CLIENT_SECRET}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Authorization': f'Basic {encoded_credentials}'}
+        headers = _token_headers()
 
         # We must send the code clean, and the redirect_uri must match exactly
         body = {
@@ -247,31 +527,124 @@ def get_user_token_full_flow(io: IOBridge):
             'redirect_uri': RUNAME
         }
 
-        response = requests.post(API_ENDPOINT, headers=headers, data=body)
+        response = _CODE_EXCHANGE_SESSION.post(API_ENDPOINT, headers=headers, data=body, timeout=TOKEN_REQUEST_TIMEOUT_SECONDS)
 
         # --- DEBUG: Print the exact error if it fails ---
         if not response.ok:
             io.log(f"eBay Error Body: {response.text}")
 
         response.raise_for_status()
-        token_data = response.json()
-        token_data['timestamp'] = time.time()
+        token_data = _loads(response.content)
+        _stamp_token(token_data)
         return token_data
     except Exception as e:
         io.log(f"Failed to get access token: {e}")
         return None
 
 
-def get_ebay_user_token(existing_tokens, io: IOBridge):
+def get_user_token_full_flow(io: IOBridge):
+    _reload_env()
+    missing = _missing_env()
+    if missing:
+        # Fail before opening the browser rather than after the code wait times out
+        io.log(f"Missing eBay settings in .env: {', '.join(missing)}.")
+        return None
+
+    # Codes are single-use and tied to one consent page; anything left over from an earlier
+    # flow (e.g. the file copy of a code already taken from memory) would fail the exchange
+    _discard_stale_oauth_code()
+
+    io.log("Opening browser for eBay consent…")
+    io.open_url(CONSENT_URL)
+
+    io.log("Waiting for authorization code (check your browser)…")
+    auth_code = _wait_for_code(OAUTH_CODE_TIMEOUT_SECONDS)
+    if not auth_code:
+        io.log("Timed out waiting for code.")
+        return None
+
+    io.log("Authorization code received.")
+    io.log("Exchanging code for access token…")
+    return _exchange_code(auth_code, io)
+
+
+def _store_refreshed_user_token(previous: Dict[str, Any], refreshed: Dict[str, Any]) -> bool:
+    """Swap in a refreshed user token unless the saved one changed while the request ran."""
+    with _TOKENS_FILE_LOCK:
+        # Re-read under the lock so a logout or a newer application token written meanwhile
+        # is kept; only the user_token entry is replaced
+        tokens = load_tokens()
+        if tokens.get('user_token') != previous:
+            return False
+        tokens['user_token'] = refreshed
+        _write_tokens_file(_dump_tokens(tokens))
+    return True
+
+
+def _saved_refresh_token() -> Optional[str]:
+    return (load_tokens().get('user_token') or {}).get('refresh_token')
+
+
+def _refresh_worker_loop() -> None:
+    # Renews the saved user token before it falls due so foreground calls find it fresh.
+    # Shares refresh_user_token's single-flight with foreground refreshes, so the two never double-post.
+    global _REFRESH_WORKER
+    quiet_io = IOBridge()
+    while True:
+        time.sleep(TOKEN_BACKGROUND_REFRESH_SECONDS)
+        try:
+            user_token_data = load_tokens().get('user_token') or {}
+            refresh_value = user_token_data.get('refresh_token')
+            if not refresh_value:
+                # Nothing to renew (never logged in, or logged out): stop until the next
+                # token check starts a worker again. Re-check under the start lock so a
+                # login saved in the meantime is not left without a worker.
+                with _REFRESH_WORKER_LOCK:
+                    if _saved_refresh_token():
+                        continue
+                    _REFRESH_WORKER = None
+                return
+            if not _token_needs_refresh(user_token_data):
+                continue
+            refreshed = refresh_user_token(refresh_value, quiet_io)
+            if not refreshed:
+                continue
+            refreshed.setdefault('refresh_token', refresh_value)
+            if _store_refreshed_user_token(user_token_data, refreshed):
+                _LOGGER.info("User token refreshed in the background.")
+            else:
+                _LOGGER.info("Saved user token changed during background refresh; result discarded.")
+        except Exception:
+            _LOGGER.warning("Background token refresh failed.", exc_info=True)
+
+
+def _start_refresh_worker() -> None:
+    global _REFRESH_WORKER
+    if _REFRESH_WORKER is not None:
+        return
+    with _REFRESH_WORKER_LOCK:
+        if _REFRESH_WORKER is None:
+            _REFRESH_WORKER = threading.Thread(target=_refresh_worker_loop, name="ebay-token-refresh", daemon=True)
+            _REFRESH_WORKER.start()
+
+
+def get_ebay_user_token(existing_tokens, io: IOBridge, min_valid_seconds: float = 0):
+    _start_refresh_worker()
     io.log("Checking user token…")
     user_token_data = existing_tokens.get('user_token', {})
 
-    if user_token_data and time.time() < user_token_data.get('timestamp', 0) + user_token_data.get('expires_in', 0) - 300:
+    if not _token_needs_refresh(user_token_data, min_valid_seconds):
         io.log("Valid user token exists.")
         return user_token_data
 
     if 'refresh_token' in user_token_data:
-        refreshed = refresh_user_token(user_token_data['refresh_token'], io)
+        try:
+            refreshed = _shared_user_token_refresh(user_token_data['refresh_token'], io)
+        except FutureTimeoutError:
+            # The other thread's refresh is still running and may yet succeed; opening a
+            # consent flow now would only race it, so report failure and let the caller retry
+            io.log("Timed out waiting for a concurrent token refresh; not starting a new login.")
+            return None
         if refreshed:
             if 'refresh_token' not in refreshed and 'refresh_token' in user_token_data:
                 refreshed['refresh_token'] = user_token_data['refresh_token']
@@ -279,4 +652,33 @@ def get_ebay_user_token(existing_tokens, io: IOBridge):
             return refreshed
         io.log("Refresh failed; falling back to login…")
 
-    return get_user_token_full_flow(io)
\ No newline at end of file
+    # Concurrent callers share one consent flow instead of opening several browser tabs
+    return _single_flight("user_login", lambda: get_user_token_full_flow(io))
+
+
+def tokens_are_fresh(existing_tokens, min_valid_seconds: float = 0) -> bool:
+    """True when neither cached token needs renewing; a dict check, no .env read or network."""
+    # Callers that take this fast path never reach get_ebay_user_token, so arm renewal here too
+    _start_refresh_worker()
+    return not (
+        _token_needs_refresh(existing_tokens.get('application_token', {}), min_valid_seconds)
+        or _token_needs_refresh(existing_tokens.get('user_token', {}), min_valid_seconds)
+    )
+
+
+def get_all_tokens(existing_tokens, io: IOBridge, min_valid_seconds: float = 0) -> Tuple[Any, Any]:
+    """Return (application_token, user_token), renewing both at once when both are stale."""
+    app_stale = _token_needs_refresh(existing_tokens.get('application_token', {}), min_valid_seconds)
+    user_stale = _token_needs_refresh(existing_tokens.get('user_token', {}), min_valid_seconds)
+    if not (app_stale and user_stale):
+        # At most one network call is needed, so there is nothing to overlap
+        return (
+            get_application_token(existing_tokens, io, min_valid_seconds),
+            get_ebay_user_token(existing_tokens, io, min_valid_seconds),
+        )
+    # The application token comes back in one round-trip; run it beside the user refresh
+    # (or consent flow) instead of ahead of it. Both share _SESSION's connection pool.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ebay-app-token") as pool:
+        app_future = pool.submit(get_application_token, existing_tokens, io, min_valid_seconds)
+        user_token = get_ebay_user_token(existing_tokens, io, min_valid_seconds)
+        return app_future.result(), user_token
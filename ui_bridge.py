@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List, Optional
 import os
 import sys
+import threading
 import webbrowser
 
 class IOBridge:
@@ -21,14 +22,20 @@ class IOBridge:
         return options[0] if options else None
 
     def open_url(self, url: str) -> None:
+        # Resolving the default browser can block for a noticeable time (notably on Windows),
+        # and nothing waits on the result, so hand it to a daemon thread.
+        threading.Thread(target=_open_url_blocking, args=(url,), name="open-url", daemon=True).start()
+
+
+def _open_url_blocking(url: str) -> None:
+    try:
+        # Use a single call with autoraise=False to avoid stealing focus when supported.
+        webbrowser.open(url, new=2, autoraise=False)
+    except Exception:
+        # Windows-specific fallback using os.startfile
         try:
-            # Use a single call with autoraise=False to avoid stealing focus when supported.
-            webbrowser.open(url, new=2, autoraise=False)
+            if sys.platform.startswith('win'):
+                os.startfile(url)
         except Exception:
-            # Windows-specific fallback using os.startfile
-            try:
-                if sys.platform.startswith('win'):
-                    os.startfile(url)
-            except Exception:
-                # Last-resort: print to console (silent logger otherwise)
-                print(f"Failed to open URL: {url}")
+            # Last-resort: print to console (silent logger otherwise)
+            print(f"Failed to open URL: {url}")
@@ -1,33 +1,62 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
+import itertools
 import json
+import logging
 import os
+import queue
+import re
+import signal
 import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
 
 from flask import Flask, jsonify, render_template, request
 from requests.exceptions import RequestException
 
 from amazon import scrape_amazon
-from bulk_parser import parse_bulk_items
+from bulk_parser import iter_bulk_items
 from ebay import list_on_ebay
 from tokens import (
     clear_user_token,
-    get_application_token,
-    get_ebay_user_token,
+    get_all_tokens,
     load_tokens,
+    reload_env_config,
     save_tokens,
     set_oauth_callback_code,
+    tokens_are_fresh,
 )
 from ui_bridge import IOBridge
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 app = Flask(__name__)
 
 MAX_LOG_ENTRIES = 1000
 PROMPT_TIMEOUT_SECONDS = 600
 MAX_UPLOAD_BYTES = 2 * 1024 * 1024
 UPDATE_WAIT_SECONDS = 25
+WORKER_POOL_SIZE = 4
+# Amazon pages fetched ahead of the listing step during bulk runs
+BULK_SCRAPE_WORKERS = max(1, int(os.getenv("BULK_SCRAPE_WORKERS", "2")))
+# How many items past the one being listed may be scraped (or queued) at once
+BULK_SCRAPE_LOOKAHEAD = 4
+# Rough upper bound on time per bulk item, used to ask for tokens that outlive the run
+# (tokens caps the request at TOKEN_MIN_VALID_MAX_SECONDS; its background refresh covers the rest)
+BULK_TOKEN_SECONDS_PER_ITEM = 60
+
+# "key: value | key: value" -> (key, value) pairs in a single scan; a part without a
+# colon is skipped and the value keeps any further colons, matching split(":", 1).
+_CUSTOM_SPEC_RE = re.compile(r"(?:^|\|)([^|:]*):([^|]*)")
 
 FLASK_SECRET_KEY = os.getenv("FLASK_SECRET_KEY")
 EPHEMERAL_SECRET = False
@@ -38,7 +67,51 @@ if not FLASK_SECRET_KEY:
 app.secret_key = FLASK_SECRET_KEY
 app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
 
-STATE_LOCK = threading.Lock()
+class _ReadWriteLock:
+    """Shared reads, exclusive writes; a waiting writer holds off new readers so it can't starve.
+
+    Not reentrant: taking read() while holding write() (or write() while holding read())
+    deadlocks, as does a nested read() on a thread once a writer is waiting.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+# Polling clients (api_state and the _is_* checks) only read STATE, so they share the lock
+STATE_LOCK = _ReadWriteLock()
 LOG_LOCK = threading.Lock()
 PROMPT_LOCK = threading.Lock()
 OPEN_URL_LOCK = threading.Lock()
@@ -61,9 +134,16 @@ STATE: Dict[str, Any] = {
     },
 }
 
-LOG_ENTRIES: List[Dict[str, Any]] = []
+# Bounded: appending past MAX_LOG_ENTRIES drops the oldest entry in O(1)
+LOG_ENTRIES: Deque[Dict[str, Any]] = deque(maxlen=MAX_LOG_ENTRIES)
 LOG_COUNTER = 0
 
+# Bulk runs reuse scrape results for the same URL for this long (0 disables the cache)
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", "scrape_cache")
+# Off by default: cached pages carry the price and stock seen at scrape time, so a re-run
+# could list with stale values. Opt in with a short TTL (e.g. 600) when re-running a list.
+SCRAPE_CACHE_TTL_SECONDS = int(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "0"))
+
 # Human-readable Activity Log file (separate from structured listing logs in logs/listings.jsonl)
 ACTIVITY_LOG_DIR = os.getenv("ACTIVITY_LOG_DIR", "logs")
 ACTIVITY_LOG_TXT = os.getenv("ACTIVITY_LOG_TXT", os.path.join(ACTIVITY_LOG_DIR, "activity_log.txt"))
@@ -74,76 +154,183 @@ PROMPT_COUNTER = 0
 
 OPEN_URLS: List[Dict[str, str]] = []
 
-bulk_pause_event = threading.Event()
 bulk_cancel_event = threading.Event()
 cancellation_event = threading.Event()
 
+# Guards the bulk pause flag; the bulk worker parks on it while paused and is woken on
+# resume or cancel, so cancelling no longer has to force the pause barrier open.
+BULK_CONTROL = threading.Condition()
+BULK_CONTROL_STATE = {"paused": False}
+
+_LOGGER = logging.getLogger(__name__)
+
+
 class OperationCancelled(Exception):
     pass
 
+
+class _WorkerPool:
+    """Fixed-size pool of daemon threads; workers are started lazily and reused."""
+
+    def __init__(self, max_workers: int, name: str) -> None:
+        self._max_workers = max_workers
+        self._name = name
+        self._tasks: queue.Queue[Callable[[], None]] = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], None]) -> None:
+        self._tasks.put(fn)
+        with self._lock:
+            if len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"{self._name}-{len(self._threads) + 1}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def _run(self) -> None:
+        while True:
+            fn = self._tasks.get()
+            try:
+                fn()
+            except Exception:
+                _LOGGER.exception("Unhandled error in %s task", self._name)
+            finally:
+                self._tasks.task_done()
+
+    def join(self) -> None:
+        """Block until every task submitted so far has run."""
+        self._tasks.join()
+
+
+# Auth, scrape and list requests share a small pool; bulk runs keep a dedicated thread.
+WORKER_POOL = _WorkerPool(WORKER_POOL_SIZE, "web-worker")
+# Single writer thread so JSON dumps never delay a worker and writes land in order.
+DISK_WRITER = _WorkerPool(1, "disk-writer")
+# Its threads are daemons, so drain queued writes before the interpreter tears them down
+atexit.register(DISK_WRITER.join)
+
+
 def _clear_cancellation() -> None:
     cancellation_event.clear()
     bulk_cancel_event.clear()
     WEB_IO.suppress_cancellation = False
 
+
+def _bulk_cancel_requested() -> bool:
+    return bulk_cancel_event.is_set() or cancellation_event.is_set()
+
+
+def _set_bulk_paused(paused: bool) -> None:
+    with BULK_CONTROL:
+        BULK_CONTROL_STATE["paused"] = paused
+        BULK_CONTROL.notify_all()
+
+
+def _toggle_bulk_paused() -> bool:
+    with BULK_CONTROL:
+        paused = not BULK_CONTROL_STATE["paused"]
+        BULK_CONTROL_STATE["paused"] = paused
+        BULK_CONTROL.notify_all()
+    return paused
+
+
+def _request_bulk_cancel() -> None:
+    bulk_cancel_event.set()
+    with BULK_CONTROL:
+        BULK_CONTROL.notify_all()
+
+
+def _wait_while_bulk_paused() -> bool:
+    """Block while bulk processing is paused. Returns True if cancellation was requested."""
+    with BULK_CONTROL:
+        BULK_CONTROL.wait_for(lambda: not BULK_CONTROL_STATE["paused"] or _bulk_cancel_requested())
+    return _bulk_cancel_requested()
+
+
 UPDATE_COUNTER = 0
 UPDATE_LOCK = threading.Lock()
 UPDATE_CONDITION = threading.Condition(UPDATE_LOCK)
 
+# Per-thread flag set by _batched_updates; a batch collapses its notifications into one
+_UPDATE_BATCH = threading.local()
 
 
 def _notify_update() -> None:
     global UPDATE_COUNTER
+    if getattr(_UPDATE_BATCH, "active", False):
+        _UPDATE_BATCH.pending = True
+        return
     with UPDATE_CONDITION:
         UPDATE_COUNTER += 1
         UPDATE_CONDITION.notify_all()
 
 
+@contextmanager
+def _batched_updates() -> Iterator[None]:
+    """Hold back _notify_update inside the block and wake long-poll waiters once at the end."""
+    if getattr(_UPDATE_BATCH, "active", False):
+        # Nested batch: the outermost one sends the notification
+        yield
+        return
+    _UPDATE_BATCH.active = True
+    _UPDATE_BATCH.pending = False
+    try:
+        yield
+    finally:
+        _UPDATE_BATCH.active = False
+        if _UPDATE_BATCH.pending:
+            _notify_update()
+
+
 def _set_processing(value: bool) -> None:
-    with STATE_LOCK:
+    with STATE_LOCK.write():
         STATE["processing"] = value
     _notify_update()
 
 
 def _set_status(label: str, message: str, tone: str = "idle") -> None:
-    with STATE_LOCK:
+    with STATE_LOCK.write():
         STATE["status"] = {"label": label, "message": message, "tone": tone}
     _notify_update()
 
 
 def _set_product(product: Optional[Dict[str, Any]]) -> None:
-    with STATE_LOCK:
+    with STATE_LOCK.write():
         STATE["product"] = product
     _notify_update()
 
 
 def _is_processing() -> bool:
-    with STATE_LOCK:
+    with STATE_LOCK.read():
         return bool(STATE["processing"])
 
 
 def _is_bulk_running() -> bool:
-    with STATE_LOCK:
+    with STATE_LOCK.read():
         return bool(STATE["bulk"]["running"])
 
 
 def _update_bulk_state(**updates: Any) -> None:
-    with STATE_LOCK:
+    with STATE_LOCK.write():
         STATE["bulk"].update(updates)
     _notify_update()
 
 
-def _build_bulk_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _build_bulk_items(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     prepared = []
     for idx, item in enumerate(items, start=1):
         prepared.append(
             {
                 "index": idx,
-                "url": item.get("url", ""),
-                "quantity": item.get("quantity", 1),
-                "note": item.get("note", ""),
-                "custom_specifics": item.get("custom_specifics", {}),
-                "title": item.get("title", ""),
+                "url": item["url"],
+                "quantity": item["quantity"],
+                "note": item["note"],
+                "custom_specifics": item["custom_specifics"],
+                "title": item["title"],
                 "status": "Ready",
                 "message": "",
             }
@@ -156,19 +343,16 @@ def _set_bulk_items(items: List[Dict[str, Any]]) -> None:
 
 
 def _update_bulk_item(index: int, status: str, message: str = "") -> None:
-    updated = False
-    items_copy = None
-    with STATE_LOCK:
+    # Mutate the item in place under the write lock; api_state copies items on read, so
+    # readers still get a consistent snapshot without re-copying the whole list here
+    with STATE_LOCK.write():
         items = STATE["bulk"].get("items", [])
-        if 0 <= index < len(items):
+        updated = 0 <= index < len(items)
+        if updated:
             items[index]["status"] = status
             items[index]["message"] = message
-            updated = True
-            # make a shallow copy of items for the updater to publish outside the lock
-            items_copy = [dict(it) for it in items]
+    # _append_log notifies long-poll waiters, which covers the state change as well
     if updated:
-        # Publish the updated items into STATE via the helper so api_state will return them
-        _update_bulk_state(items=items_copy)
         _append_log(f"Bulk item {index + 1} status updated to '{status}': {message}")
     else:
         _append_log(f"Bulk item index {index} is out of range.")
@@ -177,26 +361,30 @@ def _update_bulk_item(index: int, status: str, message: str = "") -> None:
 def _append_log(msg: str) -> None:
     global LOG_COUNTER
     # Keep the UI message format stable (HH:MM:SS) while writing a richer timestamp to disk.
-    ui_timestamp = datetime.now().strftime("%H:%M:%S")
-    entry = f"[{ui_timestamp}] {msg}"
+    # One clock read and one format call; the UI time is the tail of the file timestamp.
+    file_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    entry = f"[{file_timestamp[11:]}] {msg}"
+    file_line = f"{file_timestamp} | {msg}\n"
     with LOG_LOCK:
         LOG_COUNTER += 1
         LOG_ENTRIES.append({"id": LOG_COUNTER, "message": entry})
-        if len(LOG_ENTRIES) > MAX_LOG_ENTRIES:
-            LOG_ENTRIES[: len(LOG_ENTRIES) - MAX_LOG_ENTRIES] = []
-
-        # Best-effort persistence to a txt file for the Activity Log.
-        try:
-            os.makedirs(ACTIVITY_LOG_DIR, exist_ok=True)
-            file_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(ACTIVITY_LOG_TXT, "a", encoding="utf-8") as handle:
-                handle.write(f"{file_timestamp} | {msg}\n")
-        except OSError:
-            # Never let file logging break the UI.
-            pass
+        # Enqueue under the lock so the file keeps the same order as LOG_ENTRIES,
+        # but leave the open/append itself to the disk writer thread.
+        DISK_WRITER.submit(lambda: _write_activity_log(file_line))
     _notify_update()
 
 
+def _write_activity_log(line: str) -> None:
+    # Best-effort persistence to a txt file for the Activity Log.
+    try:
+        os.makedirs(ACTIVITY_LOG_DIR, exist_ok=True)
+        with open(ACTIVITY_LOG_TXT, "a", encoding="utf-8") as handle:
+            handle.write(line)
+    except OSError:
+        # Never let file logging break the UI.
+        pass
+
+
 def _queue_open_url(url: str, window_id: Optional[str] = None) -> None:
     with OPEN_URL_LOCK:
         OPEN_URLS.append({"url": url, "window_id": window_id})
@@ -255,23 +443,24 @@ def _await_prompt(prompt_type: str, prompt: str, default: str, options: List[str
         }
         PROMPT_EVENTS[rid] = {"event": event, "value": None, "default": default}
     _notify_update()
-    
-    # Wait until either the event is resolved, or the cancellation event is set
-    while not event.is_set():
-        if cancellation_event.is_set() and not getattr(WEB_IO, "suppress_cancellation", False):
-            with PROMPT_LOCK:
-                PROMPT_EVENTS.pop(rid, None)
-                ACTIVE_PROMPT = None
-            _notify_update()
-            raise OperationCancelled("Operation cancelled by user.")
-        event.wait(timeout=0.1)
-        
+
+    # Cancel-all and reset set every registered prompt event after raising
+    # cancellation_event, so one wait covers both an answer and a cancel. The check
+    # covers a cancel that swept PROMPT_EVENTS just before this prompt was registered.
+    # The wait is bounded so an abandoned prompt can't pin a worker thread for good.
+    answered = True
+    if not (cancellation_event.is_set() and not getattr(WEB_IO, "suppress_cancellation", False)):
+        answered = event.wait(PROMPT_TIMEOUT_SECONDS)
+
     with PROMPT_LOCK:
         entry = PROMPT_EVENTS.pop(rid, None)
         ACTIVE_PROMPT = None
     _notify_update()
     if cancellation_event.is_set() and not getattr(WEB_IO, "suppress_cancellation", False):
         raise OperationCancelled("Operation cancelled by user.")
+    if not answered:
+        _append_log(f"No answer to prompt after {PROMPT_TIMEOUT_SECONDS}s; using the default.")
+        return default
     if not entry:
         return default
     value = entry.get("value")
@@ -291,34 +480,194 @@ def _resolve_prompt(rid: int, value: Optional[str]) -> bool:
     return True
 
 
-def _ensure_ebay_auth() -> Optional[Dict[str, Any]]:
+def _store_new_tokens(tokens: Dict[str, Any], app_token: Dict[str, Any], user_token: Dict[str, Any]) -> None:
+    # Only rewrite the token file when a new token was actually issued
+    changed = False
+    for key, value in (("application_token", app_token), ("user_token", user_token)):
+        if tokens.get(key) is not value:
+            tokens[key] = value
+            changed = True
+    if changed:
+        save_tokens(tokens, WEB_IO)
+
+
+def _ensure_ebay_auth(min_valid_seconds: float = 0) -> Optional[Dict[str, Any]]:
     try:
         tokens = load_tokens() or {}
-        app_token = get_application_token(tokens, WEB_IO)
+        # Warm path (every single listing): the cached file already has usable tokens
+        if tokens_are_fresh(tokens, min_valid_seconds):
+            return tokens
+        app_token, user_token = get_all_tokens(tokens, WEB_IO, min_valid_seconds)
         if not app_token:
             WEB_IO.log("Failed to ensure application token.")
             return None
-        tokens["application_token"] = app_token
-        save_tokens(tokens, WEB_IO)
-        user_token = get_ebay_user_token(tokens, WEB_IO)
         if not user_token:
             WEB_IO.log("Failed to ensure user token.")
             return None
-        tokens["user_token"] = user_token
-        save_tokens(tokens, WEB_IO)
+        _store_new_tokens(tokens, app_token, user_token)
         return tokens
     except Exception as exc:
         WEB_IO.log(f"Auth ensure error: {exc}")
         return None
 
 
+def _json_loads(raw: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_bytes(data: Any) -> bytes:
+    """Serialise data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson is stricter than json (e.g. non-str keys); fall back below
+            pass
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _write_bytes_file(path: str, payload: bytes) -> None:
+    with open(path, "wb") as handle:
+        handle.write(payload)
+
+
+def _write_json_file(path: str, data: Any) -> None:
+    _write_bytes_file(path, _json_bytes(data))
+
+
+def _write_json_file_async(path: str, data: Dict[str, Any]) -> None:
+    # Serialise here, on the caller's thread: the writer only ever sees finished bytes, so
+    # callers can keep changing nested lists/dicts (images, specifics) once this returns
+    try:
+        payload = _json_bytes(data)
+    except (TypeError, ValueError) as exc:
+        _append_log(f"Failed to write {path}: {exc}")
+        return
+
+    def write() -> None:
+        try:
+            _write_bytes_file(path, payload)
+        except OSError as exc:
+            _append_log(f"Failed to write {path}: {exc}")
+
+    DISK_WRITER.submit(write)
+
+
+def _scrape_cache_path(url: str) -> str:
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(SCRAPE_CACHE_DIR, f"{key}.json")
+
+
+def _load_cached_scrape(url: str) -> Optional[Dict[str, Any]]:
+    if SCRAPE_CACHE_TTL_SECONDS <= 0 or not url:
+        return None
+    try:
+        with open(_scrape_cache_path(url), "rb") as handle:
+            entry = _json_loads(handle.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("url") != url:
+        return None
+    if time.time() - float(entry.get("timestamp", 0)) > SCRAPE_CACHE_TTL_SECONDS:
+        return None
+    product = entry.get("product")
+    return product if isinstance(product, dict) else None
+
+
+def _store_cached_scrape(url: str, product: Dict[str, Any]) -> None:
+    if SCRAPE_CACHE_TTL_SECONDS <= 0 or not url:
+        return
+    if product.get("Title") in (None, "", "N/A"):
+        # Likely a captcha/blocked page; don't pin it for the whole TTL
+        return
+    # Per-item values are re-applied on every hit, so keep them out of the cache
+    cached = {k: v for k, v in product.items() if k not in ("customSpecifics", "sellerNote", "quantity")}
+    try:
+        os.makedirs(SCRAPE_CACHE_DIR, exist_ok=True)
+        _write_json_file(_scrape_cache_path(url), {"url": url, "timestamp": time.time(), "product": cached})
+    except (OSError, TypeError, ValueError) as exc:
+        WEB_IO.log(f"Failed to cache scrape result: {exc}")
+
+
+def _apply_item_overrides(
+    product: Dict[str, Any], note: str, quantity: Any, custom_specifics: Dict[str, str]
+) -> Dict[str, Any]:
+    """Carry bulk item values onto a cached product the same way scrape_amazon does."""
+    if isinstance(custom_specifics, dict) and custom_specifics:
+        product["customSpecifics"] = {str(k): str(v) for k, v in custom_specifics.items()}
+    if note:
+        product["sellerNote"] = note
+    if quantity is not None:
+        try:
+            product["quantity"] = int(quantity)
+        except (TypeError, ValueError):
+            pass
+    return product
+
+
+class _PrefixedIO(IOBridge):
+    """Forward to another bridge, prefixing log lines so concurrent work stays readable."""
+
+    def __init__(self, inner: IOBridge, prefix: str, cancelled: Optional[Callable[[], bool]] = None) -> None:
+        super().__init__()
+        self._inner = inner
+        self._prefix = prefix
+        self._cancelled = cancelled
+
+    def log(self, msg: str) -> None:
+        # Work that outlives a cancel stops at its next log line instead of writing after it
+        if self._cancelled is not None and self._cancelled():
+            raise OperationCancelled("Operation cancelled by user.")
+        self._inner.log(f"{self._prefix}{msg}")
+
+    def prompt_text(self, prompt: str, default: str = "", options: List[str] | None = None) -> str:
+        return self._inner.prompt_text(prompt, default, options)
+
+    def prompt_choice(self, prompt: str, options: List[str]) -> Optional[str]:
+        return self._inner.prompt_choice(prompt, options)
+
+    def open_url(self, url: str) -> None:
+        self._inner.open_url(url)
+
+
+def _scrape_bulk_item(index: int, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Scrape (or load from cache) one bulk item; runs on the bulk scrape pool.
+
+    Item status is left to the listing loop, so a prefetch still running after a cancel
+    can't overwrite the "Cancelled" status, and items ahead don't show as "Scraping" early.
+    """
+    if _wait_while_bulk_paused():
+        raise OperationCancelled("Operation cancelled by user.")
+    # _build_bulk_items fills every key, so plain indexing is safe here
+    io = _PrefixedIO(WEB_IO, f"[Item {item['index']}] ", cancelled=_bulk_cancel_requested)
+    item_url = item["url"]
+    product = _load_cached_scrape(item_url)
+    if product is not None:
+        io.log("Using cached Amazon scrape for this URL.")
+        return _apply_item_overrides(product, item["note"], item["quantity"], item["custom_specifics"])
+    product = scrape_amazon(
+        item_url,
+        note=item["note"],
+        quantity=item["quantity"],
+        custom_specifics=item["custom_specifics"],
+        io=io,
+        # Several scrapes run at once; a shared website.html dump would be overwritten
+        debug_html_path=None,
+    )
+    if product:
+        _store_cached_scrape(item_url, product)
+    return product
+
+
 def _parse_custom_specifics(raw: str) -> Dict[str, str]:
     custom_specifics: Dict[str, str] = {}
-    for part in raw.split("|"):
-        if ":" in part:
-            key, value = part.split(":", 1)
-            if key.strip() and value.strip():
-                custom_specifics[key.strip()] = value.strip()
+    for key, value in _CUSTOM_SPEC_RE.findall(raw):
+        key = key.strip()
+        value = value.strip()
+        if key and value:
+            custom_specifics[key] = value
     return custom_specifics
 
 
@@ -343,7 +692,7 @@ def oauth_callback():
 
 @app.get("/api/state")
 def api_state():
-    with STATE_LOCK:
+    with STATE_LOCK.read():
         bulk_state = dict(STATE["bulk"])
         bulk_state["items"] = [dict(item) for item in bulk_state.get("items", [])]
         state = {
@@ -359,8 +708,11 @@ def api_state():
 def api_logs():
     since = int(request.args.get("since", 0))
     with LOG_LOCK:
-        entries = [entry for entry in LOG_ENTRIES if entry["id"] > since]
+        # Ids are contiguous, so the unseen entries are the last (last_id - since) ones;
+        # walk them from the right instead of scanning the whole deque
         last_id = LOG_ENTRIES[-1]["id"] if LOG_ENTRIES else since
+        unseen = min(len(LOG_ENTRIES), max(0, last_id - since))
+        entries = list(itertools.islice(reversed(LOG_ENTRIES), unseen))[::-1]
     return jsonify({"entries": entries, "last_id": last_id})
 
 
@@ -427,7 +779,8 @@ def api_load_json():
         raw = file.read(MAX_UPLOAD_BYTES + 1)
         if len(raw) > MAX_UPLOAD_BYTES:
             return jsonify({"ok": False, "error": "Uploaded JSON file is too large."}), 413
-        data = json.loads(raw.decode("utf-8"))
+        # Both orjson and json accept the raw bytes, so skip an intermediate str copy
+        data = _json_loads(raw)
     except (UnicodeDecodeError, json.JSONDecodeError, OSError) as exc:
         return jsonify({"ok": False, "error": f"Failed to parse JSON: {exc}"}), 400
     _set_product(data)
@@ -456,18 +809,14 @@ def api_auth():
         _set_processing(True)
         try:
             tokens = load_tokens()
-            app_token = get_application_token(tokens, WEB_IO)
+            app_token, user_token = get_all_tokens(tokens, WEB_IO)
             if not app_token:
                 _set_status("Attention", "Failed to get application token.", "error")
                 return
-            tokens["application_token"] = app_token
-            save_tokens(tokens, WEB_IO)
-            user_token = get_ebay_user_token(tokens, WEB_IO)
             if not user_token:
                 _set_status("Attention", "Failed to get user token.", "error")
                 return
-            tokens["user_token"] = user_token
-            save_tokens(tokens, WEB_IO)
+            _store_new_tokens(tokens, app_token, user_token)
             WEB_IO.log("All tokens are ready.")
             _set_status("Ready", "All tokens are ready.", "success")
         except OperationCancelled:
@@ -476,7 +825,7 @@ def api_auth():
         finally:
             _set_processing(False)
 
-    threading.Thread(target=work, daemon=True).start()
+    WORKER_POOL.submit(work)
     return jsonify({"ok": True})
 
 
@@ -506,7 +855,7 @@ def api_logout():
         finally:
             _set_processing(False)
 
-    threading.Thread(target=work, daemon=True).start()
+    WORKER_POOL.submit(work)
     return jsonify({"ok": True})
 
 
@@ -540,11 +889,7 @@ def api_scrape():
             _set_product(product)
             WEB_IO.log("Product scraped. You can now list on eBay.")
             _set_status("Ready", "Product scraped. Ready to list.", "success")
-            try:
-                with open("product.json", "w", encoding="utf-8") as handle:
-                    json.dump(product, handle, indent=2)
-            except (OSError, TypeError, ValueError) as exc:
-                WEB_IO.log(f"Failed to write product.json: {exc}")
+            _write_json_file_async("product.json", product)
         except RequestException as exc:
             WEB_IO.log(f"Scrape failed: {exc}")
             _set_status("Attention", "Failed to scrape Amazon product. Check your network connection.", "error")
@@ -554,7 +899,7 @@ def api_scrape():
         finally:
             _set_processing(False)
 
-    threading.Thread(target=work, daemon=True).start()
+    WORKER_POOL.submit(work)
     return jsonify({"ok": True})
 
 
@@ -564,7 +909,7 @@ def api_list():
         return jsonify({"ok": False, "error": "Another task is running."}), 400
     payload = request.get_json(silent=True) or {}
     window_id = payload.get("window_id")
-    with STATE_LOCK:
+    with STATE_LOCK.read():
         product = STATE["product"]
     if not product:
         return jsonify({"ok": False, "error": "Please scrape or load a product first."}), 400
@@ -580,7 +925,7 @@ def api_list():
                 WEB_IO.log("Authentication failed. Check credentials and try again.")
                 _set_status("Attention", "Authentication failed. Check credentials.", "error")
                 return
-            result = list_on_ebay(product, WEB_IO)
+            result = list_on_ebay(product, WEB_IO, tokens=ensured)
             if result.get("ok"):
                 WEB_IO.log(f"Listing complete. Item ID: {result.get('item_id')}")
                 _set_status("Ready", f"Listing complete. Item ID {result.get('item_id')}.", "success")
@@ -596,7 +941,7 @@ def api_list():
         finally:
             _set_processing(False)
 
-    threading.Thread(target=work, daemon=True).start()
+    WORKER_POOL.submit(work)
     return jsonify({"ok": True})
 
 
@@ -604,15 +949,14 @@ def api_list():
 def api_bulk_preview():
     payload = request.get_json(silent=True) or {}
     text = str(payload.get("text", "")).strip()
-    with STATE_LOCK:
+    with STATE_LOCK.read():
         if STATE["bulk"]["running"]:
             items = [dict(item) for item in STATE["bulk"].get("items", [])]
             return jsonify({"ok": True, "items": items})
     if not text:
         _set_bulk_items([])
         return jsonify({"ok": True, "items": []})
-    items = parse_bulk_items(text)
-    prepared = _build_bulk_items(items)
+    prepared = _build_bulk_items(iter_bulk_items(text.splitlines()))
     _set_bulk_items(prepared)
     return jsonify({"ok": True, "items": prepared})
 
@@ -626,20 +970,20 @@ def api_bulk_process():
     text = str(payload.get("text", "")).strip()
     if not text:
         return jsonify({"ok": False, "error": "Paste bulk text first."}), 400
-    items = parse_bulk_items(text)
-    if not items:
+    prepared_items = _build_bulk_items(iter_bulk_items(text.splitlines()))
+    if not prepared_items:
         return jsonify({"ok": False, "error": "No items could be parsed from the text."}), 400
-    prepared_items = _build_bulk_items(items)
     _set_bulk_items(prepared_items)
     _clear_cancellation()
-    _set_status("Working", f"Bulk processing started ({len(items)} items).", "working")
+    _set_status("Working", f"Bulk processing started ({len(prepared_items)} items).", "working")
 
     def work():
         WEB_IO.active_window_id = window_id
         _update_bulk_state(running=True, paused=False, cancelled=False, processed=0, total=len(prepared_items))
-        bulk_pause_event.set()
+        _set_bulk_paused(False)
+        scrape_pool = None
         try:
-            ensured = _ensure_ebay_auth()
+            ensured = _ensure_ebay_auth(len(prepared_items) * BULK_TOKEN_SECONDS_PER_ITEM)
             if not ensured:
                 WEB_IO.log("Authentication failed. Check credentials and try again.")
                 _set_status("Attention", "Authentication failed. Check credentials.", "error")
@@ -647,22 +991,28 @@ def api_bulk_process():
             os.makedirs("bulk_products", exist_ok=True)
             processed_count = 0
             total_items = len(prepared_items)
+            # Scrapes run ahead on a small pool so the next pages are fetched while the
+            # current item is being listed; results are still consumed in order. Only a
+            # bounded window is queued so a cancel wastes little and memory stays flat.
+            scrape_pool = ThreadPoolExecutor(max_workers=BULK_SCRAPE_WORKERS, thread_name_prefix="bulk-scrape")
+            scrape_futures: Dict[int, Future] = {}
+            next_scrape = 0
             for index, item in enumerate(prepared_items):
-                display_index = item.get("index", index + 1)
-                bulk_pause_event.wait()
-                if bulk_cancel_event.is_set() or cancellation_event.is_set():
+                while next_scrape < total_items and next_scrape <= index + BULK_SCRAPE_LOOKAHEAD:
+                    scrape_futures[next_scrape] = scrape_pool.submit(
+                        _scrape_bulk_item, next_scrape, prepared_items[next_scrape]
+                    )
+                    next_scrape += 1
+                display_index = item["index"]
+                if _wait_while_bulk_paused():
                     raise OperationCancelled("Operation cancelled by user.")
-                _set_status("Working", f"Processing item {display_index} of {total_items}.", "working")
-                _update_bulk_item(index, "Scraping", "Scraping Amazon listing.")
-                WEB_IO.log(f"=== Processing Item {display_index}/{total_items} ===")
+                with _batched_updates():
+                    _set_status("Working", f"Processing item {display_index} of {total_items}.", "working")
+                    WEB_IO.log(f"=== Processing Item {display_index}/{total_items} ===")
+                    # Set here rather than in the prefetch, so only the item being worked on shows it
+                    _update_bulk_item(index, "Scraping", "Scraping Amazon listing.")
                 try:
-                    product = scrape_amazon(
-                        item.get("url", ""),
-                        note=item.get("note", ""),
-                        quantity=item.get("quantity", 1),
-                        custom_specifics=item.get("custom_specifics", {}),
-                        io=WEB_IO,
-                    )
+                    product = scrape_futures.pop(index).result()
                 except RequestException as exc:
                     message = f"Scrape failed: {exc}"
                     WEB_IO.log(message)
@@ -672,31 +1022,27 @@ def api_bulk_process():
                     WEB_IO.log(f"Skipping item {display_index} due to scraping failure.")
                     _update_bulk_item(index, "Failed", "Scrape failed.")
                     continue
-                with open(
-                    os.path.join("bulk_products", f"product_{display_index}.json"),
-                    "w",
-                    encoding="utf-8",
-                ) as handle:
-                    json.dump(product, handle, indent=2)
+                _write_json_file_async(os.path.join("bulk_products", f"product_{display_index}.json"), product)
                 _update_bulk_item(index, "Listing", "Listing on eBay.")
                 try:
-                    result = list_on_ebay(product, WEB_IO)
+                    result = list_on_ebay(product, WEB_IO, tokens=ensured)
                 except RequestException as exc:
                     message = f"Listing failed: {exc}"
                     WEB_IO.log(message)
                     _update_bulk_item(index, "Failed", message)
                     continue
-                if result.get("ok"):
-                    processed_count += 1
-                    _update_bulk_item(
-                        index,
-                        "Listed",
-                        f"Listed successfully (Item ID {result.get('item_id')}).",
-                    )
-                else:
-                    _update_bulk_item(index, "Failed", "Listing failed.")
-                _update_bulk_state(processed=processed_count)
-            if not bulk_cancel_event.is_set() and not cancellation_event.is_set():
+                with _batched_updates():
+                    if result.get("ok"):
+                        processed_count += 1
+                        _update_bulk_item(
+                            index,
+                            "Listed",
+                            f"Listed successfully (Item ID {result.get('item_id')}).",
+                        )
+                    else:
+                        _update_bulk_item(index, "Failed", "Listing failed.")
+                    _update_bulk_state(processed=processed_count)
+            if not _bulk_cancel_requested():
                 WEB_IO.log(f"Bulk processing finished. Processed {processed_count} items.")
                 _set_status("Ready", "Bulk processing finished.", "success")
             else:
@@ -704,12 +1050,18 @@ def api_bulk_process():
         except OperationCancelled:
             WEB_IO.suppress_cancellation = True
             WEB_IO.log("Bulk process cancelled.")
-            _update_bulk_item(index, "Cancelled", "Cancelled by user.")
-            for remaining_index in range(index + 1, total_items):
-                _update_bulk_item(remaining_index, "Cancelled", "Cancelled before processing.")
-            _set_status("Attention", "Bulk processing cancelled.", "warning")
+            if scrape_pool is not None:
+                # Drop queued prefetches before the sweep; running ones stop at their next log line
+                scrape_pool.shutdown(wait=False, cancel_futures=True)
+            with _batched_updates():
+                _update_bulk_item(index, "Cancelled", "Cancelled by user.")
+                for remaining_index in range(index + 1, total_items):
+                    _update_bulk_item(remaining_index, "Cancelled", "Cancelled before processing.")
+                _set_status("Attention", "Bulk processing cancelled.", "warning")
         finally:
-            _update_bulk_state(running=False, paused=False, cancelled=bulk_cancel_event.is_set() or cancellation_event.is_set())
+            if scrape_pool is not None:
+                scrape_pool.shutdown(wait=False, cancel_futures=True)
+            _update_bulk_state(running=False, paused=False, cancelled=_bulk_cancel_requested())
 
     threading.Thread(target=work, daemon=True).start()
     return jsonify({"ok": True})
@@ -719,13 +1071,11 @@ def api_bulk_process():
 def api_bulk_pause():
     if not _is_bulk_running():
         return jsonify({"ok": False, "error": "Bulk processing is not running."}), 400
-    if bulk_pause_event.is_set():
-        bulk_pause_event.clear()
+    if _toggle_bulk_paused():
         _update_bulk_state(paused=True)
         WEB_IO.log("Bulk processing paused.")
         _set_status("Paused", "Bulk processing paused.", "warning")
         return jsonify({"ok": True, "paused": True})
-    bulk_pause_event.set()
     _update_bulk_state(paused=False)
     WEB_IO.log("Bulk processing resumed.")
     _set_status("Working", "Bulk processing resumed.", "working")
@@ -736,9 +1086,7 @@ def api_bulk_pause():
 def api_bulk_cancel():
     if not _is_bulk_running():
         return jsonify({"ok": False, "error": "Bulk processing is not running."}), 400
-    bulk_cancel_event.set()
-    if not bulk_pause_event.is_set():
-        bulk_pause_event.set()
+    _request_bulk_cancel()
     _update_bulk_state(cancelled=True)
     WEB_IO.log("Cancellation requested...")
     _set_status("Attention", "Bulk processing cancellation requested.", "warning")
@@ -749,9 +1097,7 @@ def api_bulk_cancel():
 def api_cancel_all():
     global ACTIVE_PROMPT
     cancellation_event.set()
-    bulk_cancel_event.set()
-    if not bulk_pause_event.is_set():
-        bulk_pause_event.set()
+    _request_bulk_cancel()
     
     with PROMPT_LOCK:
         for rid, entry in list(PROMPT_EVENTS.items()):
@@ -771,9 +1117,7 @@ def api_reset_workspace():
     global ACTIVE_PROMPT, LOG_ENTRIES, LOG_COUNTER
     # 1. Stop all operations
     cancellation_event.set()
-    bulk_cancel_event.set()
-    if not bulk_pause_event.is_set():
-        bulk_pause_event.set()
+    _request_bulk_cancel()
         
     with PROMPT_LOCK:
         for rid, entry in list(PROMPT_EVENTS.items()):
@@ -781,7 +1125,7 @@ def api_reset_workspace():
         ACTIVE_PROMPT = None
         
     # 2. Reset STATE in memory (except logs)
-    with STATE_LOCK:
+    with STATE_LOCK.write():
         STATE["product"] = None
         STATE["processing"] = False
         STATE["status"] = {
@@ -823,6 +1167,15 @@ def api_reset_workspace():
                 except Exception:
                     pass
                     
+    if os.path.exists(SCRAPE_CACHE_DIR):
+        for filename in os.listdir(SCRAPE_CACHE_DIR):
+            filepath = os.path.join(SCRAPE_CACHE_DIR, filename)
+            if os.path.isfile(filepath):
+                try:
+                    os.remove(filepath)
+                except Exception:
+                    pass
+                    
     if os.path.exists("listing_images"):
         for filename in os.listdir("listing_images"):
             filepath = os.path.join("listing_images", filename)
@@ -846,6 +1199,9 @@ def run_web(host: str = "127.0.0.1", port: int = 5000) -> None:
         )
     if EPHEMERAL_SECRET:
         _append_log("FLASK_SECRET_KEY not set; sessions will reset on each restart.")
+    if hasattr(signal, "SIGHUP"):
+        # Token calls only re-parse .env when its mtime changes; SIGHUP forces a reload
+        signal.signal(signal.SIGHUP, lambda *_: reload_env_config())
     _append_log("Starting web UI...")
     app.run(host=host, port=port, debug=False)
 